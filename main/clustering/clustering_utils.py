@@ -1,5 +1,4 @@
 from typing import Union, List, Tuple
-import matplotlib.pyplot as plt
 import numpy as np
 
 
@@ -42,6 +41,7 @@ def color_map_nonlinear(map_amount: int = 3) -> List[str]:
 
 
 def draw_cluster(cluster: np.ndarray, rgb: Union[Tuple[int, int, int], str] = (255, 0, 0), axes=None, show=False):
+    import matplotlib.pyplot as plt
     axes = plt.gca() if axes is None else axes
     if cluster.shape[1] == 2:
         if isinstance(rgb, str):
@@ -61,6 +61,7 @@ def draw_clusters(clusters: List[np.ndarray],
                   colors: Union[List[Tuple[int, int, int]], List[str], None] = None,
                   cluster_centers: Union[List[np.ndarray], None] = None,
                   title="figure"):
+    import matplotlib.pyplot as plt
     colors = color_map_nonlinear(len(clusters))if colors is None else colors
     fig, axes = plt.figure().add_subplot(projection='3d'), plt.gca()#plt.subplots(1, projection='3d')
     legend = []
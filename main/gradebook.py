@@ -0,0 +1,141 @@
+from typing import Iterable, Tuple, Union
+import numpy as np
+from students_reader import Student
+from students_table import StudentTable
+
+"""
+Ведомость успеваемости: посещаемость и оценки по студентам и группам.
+Все показатели считаются сгруппированными векторными свёртками по колонкам StudentTable
+(np.bincount по номеру студента/группы, np.add.reduceat по отсортированным ключам), без обхода
+объектов Student и LabWorkSession.
+    attendance_rate - доля посещённых занятий
+    missed          - количество пропущенных занятий
+    mean_mark       - средняя оценка по занятиям с оценкой (NaN, если оценок нет)
+    median_mark     - медиана оценок (NaN, если оценок нет)
+Лабораторная работа считается выполненной, если студент присутствовал на занятии и получил оценку.
+"""
+
+REPORT_FIELDS = [('n_sessions', '<i8'), ('attended', '<i8'), ('missed', '<i8'), ('attendance_rate', '<f8'),
+                 ('n_marks', '<i8'), ('mean_mark', '<f8'), ('median_mark', '<f8')]
+
+
+def _as_table(students: Union[StudentTable, Iterable[Student]]) -> StudentTable:
+    return students if isinstance(students, StudentTable) else StudentTable.from_students(students)
+
+
+def _group_codes(table: StudentTable, by_subgroup: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ключи групп (group или пары (group, subgroup)) и номер ключа для каждого студента
+    """
+    students = table.students
+    keys = np.column_stack((students['group'], students['subgroup'])) if by_subgroup else students['group']
+    unique, codes = np.unique(keys, return_inverse=True, axis=0 if by_subgroup else None)
+    return unique, codes.ravel()
+
+
+def _grouped_median(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Медиана values внутри каждой группы codes (NaN для пустых групп)
+    """
+    order = np.lexsort((values, codes))
+    values = values[order].astype(float)
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    result = np.full(n_groups, np.nan)
+    filled = counts > 0
+    lower = starts[filled] + (counts[filled] - 1) // 2
+    upper = starts[filled] + counts[filled] // 2
+    result[filled] = 0.5 * (values[lower] + values[upper])
+    return result
+
+
+def _report(codes: np.ndarray, n_groups: int, table: StudentTable) -> np.ndarray:
+    """
+    Показатели REPORT_FIELDS по группам занятий: codes - номер группы для каждого занятия
+    """
+    sessions = table.sessions
+    report = np.zeros(n_groups, dtype=REPORT_FIELDS)
+    report['n_sessions'] = np.bincount(codes, minlength=n_groups)
+    report['attended'] = np.bincount(codes, weights=sessions['presence'], minlength=n_groups)
+    report['missed'] = report['n_sessions'] - report['attended']
+    marked = sessions['lab_work_mark'] >= 0
+    marks = sessions['lab_work_mark'][marked]
+    report['n_marks'] = np.bincount(codes[marked], minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        report['attendance_rate'] = report['attended'] / report['n_sessions']
+        report['mean_mark'] = np.bincount(codes[marked], weights=marks, minlength=n_groups) / report['n_marks']
+    report['median_mark'] = _grouped_median(codes[marked], marks, n_groups)
+    return report
+
+
+def student_report(students: Union[StudentTable, Iterable[Student]]) -> np.ndarray:
+    """
+    Показатели каждого студента.
+    :param students: StudentTable или любой итерируемый объект со студентами
+    :return: структурированный массив по строке на студента: unique_id, group, subgroup и REPORT_FIELDS
+    """
+    table = _as_table(students)
+    report = _report(table.sessions['student'], len(table), table)
+    result = np.zeros(len(table), dtype=[('unique_id', '<i8'), ('group', '<i4'), ('subgroup', '<i4')] +
+                      REPORT_FIELDS)
+    for name in ('unique_id', 'group', 'subgroup'):
+        result[name] = table.students[name]
+    for name, _ in REPORT_FIELDS:
+        result[name] = report[name]
+    return result
+
+
+def group_report(students: Union[StudentTable, Iterable[Student]], by_subgroup: bool = False) -> np.ndarray:
+    """
+    Показатели групп (или подгрупп): все занятия студентов группы считаются вместе.
+    :param students: StudentTable или любой итерируемый объект со студентами
+    :param by_subgroup: группировать по парам (group, subgroup)
+    :return: структурированный массив по строке на группу: group, [subgroup,] n_students и REPORT_FIELDS
+    """
+    table = _as_table(students)
+    keys, codes = _group_codes(table, by_subgroup)
+    report = _report(codes[table.sessions['student']], keys.shape[0], table)
+    key_fields = [('group', '<i4'), ('subgroup', '<i4')] if by_subgroup else [('group', '<i4')]
+    result = np.zeros(keys.shape[0], dtype=key_fields + [('n_students', '<i8')] + REPORT_FIELDS)
+    if by_subgroup:
+        result['group'], result['subgroup'] = keys[:, 0], keys[:, 1]
+    else:
+        result['group'] = keys
+    result['n_students'] = np.bincount(codes, minlength=keys.shape[0])
+    for name, _ in REPORT_FIELDS:
+        result[name] = report[name]
+    return result
+
+
+def completion_matrix(students: Union[StudentTable, Iterable[Student]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Матрица выполнения лабораторных работ студентами.
+    :return: номера лабораторных работ (столбцы) и матрица (n_students, n_labs) int8: 1 - работа выполнена
+    """
+    table = _as_table(students)
+    sessions = table.sessions
+    done = (sessions['presence'] == 1) & (sessions['lab_work_mark'] >= 0) & (sessions['lab_work_number'] >= 0)
+    labs, columns = np.unique(sessions['lab_work_number'][done], return_inverse=True)
+    matrix = np.zeros((len(table), labs.size), dtype=np.int8)
+    matrix[sessions['student'][done], columns.ravel()] = 1
+    return labs, matrix
+
+
+def group_completion_matrix(students: Union[StudentTable, Iterable[Student]],
+                            by_subgroup: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Доля студентов группы, выполнивших каждую лабораторную работу.
+    :return: ключи групп (group или пары (group, subgroup)), номера лабораторных работ
+             и матрица (n_groups, n_labs) с долями
+    """
+    table = _as_table(students)
+    labs, matrix = completion_matrix(table)
+    keys, codes = _group_codes(table, by_subgroup)
+    if keys.shape[0] == 0:
+        return keys, labs, np.zeros((0, labs.size))
+    # строки студентов упорядочиваются по группе, суммы по группам - np.add.reduceat по началам групп
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(keys.shape[0]))
+    totals = np.add.reduceat(matrix[order].astype(np.int64), starts, axis=0) if labs.size else \
+        np.zeros((keys.shape[0], 0), dtype=np.int64)
+    return keys, labs, totals / np.bincount(codes, minlength=keys.shape[0])[:, np.newaxis]
@@ -0,0 +1,72 @@
+"""
+Замер времени холодного импорта основных модулей (python -X importtime).
+Для каждого модуля запускается отдельный интерпретатор, из его вывода берётся суммарное время импорта
+и список подгруженных пакетов. Скрипт завершается с ненулевым кодом, если бюджет превышен
+или при импорте подтянулась тяжёлая зависимость (keras, matplotlib, scipy, tensorflow).
+Запуск из каталога main:
+    python import_time_benchmark.py
+"""
+from typing import Dict, List, Tuple
+import subprocess
+import os.path
+import sys
+
+# модуль -> бюджет холодного импорта в миллисекундах
+IMPORT_BUDGETS_MS: Dict[str, float] = {
+    "students_reader": 150.0,
+    "regressions.regression": 400.0,
+    "regressions.log_regression": 400.0,
+}
+
+HEAVY_PACKAGES = ("keras", "tensorflow", "matplotlib", "scipy")
+
+
+def measure_import(module: str, cwd: str) -> Tuple[float, List[str]]:
+    """
+    Импортирует module в чистом интерпретаторе с флагом -X importtime.
+    :param module: имя модуля
+    :param cwd: каталог, из которого выполняется импорт
+    :return: суммарное время импорта модуля в мс и список всех импортированных пакетов
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"measure_import:: unable to import \"{module}\":\n{result.stderr}")
+    cumulative_us = 0
+    imported = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        package = package.strip()
+        imported.append(package)
+        if package == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us * 1e-3, imported
+
+
+def run_benchmark(budgets: Dict[str, float] = None, cwd: str = None) -> bool:
+    """
+    Проверяет бюджеты холодного импорта.
+    :param budgets: модуль -> бюджет в мс
+    :param cwd: каталог, из которого выполняется импорт (по умолчанию каталог этого файла)
+    :return: True, если все модули уложились в бюджет и не подгрузили тяжёлые зависимости
+    """
+    budgets = IMPORT_BUDGETS_MS if budgets is None else budgets
+    cwd = os.path.dirname(os.path.abspath(__file__)) if cwd is None else cwd
+    success = True
+    for module, budget in budgets.items():
+        elapsed, imported = measure_import(module, cwd)
+        heavy = sorted({p.split('.')[0] for p in imported if p.split('.')[0] in HEAVY_PACKAGES})
+        passed = elapsed <= budget and not heavy
+        success &= passed
+        print(f"{'OK  ' if passed else 'FAIL'} {module:<32} {elapsed:8.1f} ms (budget {budget:.0f} ms)"
+              f"{'' if not heavy else ', heavy imports: ' + ', '.join(heavy)}")
+    return success
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run_benchmark() else 1)
@@ -0,0 +1,196 @@
+from typing import Any, Dict, List, Sequence, Tuple, Union
+import itertools
+import tempfile
+import os.path
+import sys
+import numpy as np
+from regressions.regression import Regression, RandomSource
+from regressions.solvers import solve_normal_equations
+
+"""
+Перебор гиперпараметров по сетке с k-fold кросс-валидацией.
+Единица работы - один fold: для него один раз готовится состояние (например, суммы моментов обучающей части),
+после чего по этому состоянию оцениваются все точки сетки параметров. Fold-ы могут выполняться в пуле процессов,
+данные при этом передаются процессам через np.memmap, а не копируются.
+Оценщик (evaluator) - объект с методами:
+    prepare(data, train_indices, test_indices) -> состояние fold-а
+    score(state, params) -> ошибка на тестовой части (меньше - лучше)
+"""
+
+ParamsGrid = Dict[str, Sequence[Any]]
+
+
+def k_fold_indices(n_points: int, n_folds: int = 5,
+                   rng: RandomSource = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Случайное разбиение индексов [0, n_points) на n_folds частей.
+    :param n_points: количество точек
+    :param n_folds: количество частей
+    :param rng: генератор случайных чисел, seed или None
+    :return: список пар (индексы обучающей части, индексы тестовой части)
+    """
+    if not 2 <= n_folds <= n_points:
+        raise ValueError(f"k_fold_indices :: incorrect args :\n"
+                         f"n_points: {n_points},\n"
+                         f"n_folds : {n_folds}")
+    folds = np.array_split(np.random.default_rng(rng).permutation(n_points), n_folds)
+    return [(np.sort(np.concatenate(folds[:i] + folds[i + 1:])), np.sort(folds[i])) for i in range(n_folds)]
+
+
+class PolyRegressionEvaluator:
+    """
+    Выбор порядка полинома Regression.poly_regression (параметр "order").
+    data - строки вида [x, y]. Для fold-а один раз считаются суммы степеней Σx^p и Σy*x^j по обучающей части
+    для максимального порядка, после чего система любого порядка - это срез ганкелевой матрицы.
+    Ошибка - средний квадрат невязки на тестовой части.
+    """
+    def __init__(self, max_order: int = 10, method: str = "cholesky"):
+        self._max_order = max_order
+        self._method = method
+
+    def prepare(self, data: np.ndarray, train: np.ndarray, test: np.ndarray) -> Tuple[np.ndarray, np.ndarray,
+                                                                                      np.ndarray, np.ndarray]:
+        x, y = data[train, 0], data[train, 1]
+        powers = np.vander(x, 2 * self._max_order - 1, increasing=True)
+        degrees = np.arange(self._max_order)
+        gram = powers.sum(axis=0)[degrees[:, np.newaxis] + degrees[np.newaxis, :]]
+        rhs = y @ powers[:, :self._max_order]
+        return gram, rhs, np.asarray(data[test, 0]), np.asarray(data[test, 1])
+
+    def score(self, state: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], params: Dict[str, Any]) -> float:
+        gram, rhs, x_test, y_test = state
+        order = int(params["order"])
+        if not 1 <= order <= self._max_order:
+            raise ValueError(f"PolyRegressionEvaluator :: order {order} is out of range [1, {self._max_order}]")
+        coefficients = solve_normal_equations(gram[:order, :order], rhs[:order], self._method)
+        residuals = Regression.polynom(x_test, coefficients)
+        residuals -= y_test
+        return float(np.dot(residuals, residuals)) / residuals.size
+
+
+class LogisticRegressionEvaluator:
+    """
+    Выбор параметров LogisticRegression (learning_rate, max_iters, accuracy).
+    data - строки вида [признаки..., группа]. Ошибка - функция потерь loss на тестовой части.
+    """
+    def prepare(self, data: np.ndarray, train: np.ndarray, test: np.ndarray) -> Tuple[np.ndarray, ...]:
+        return (np.asarray(data[train, :-1]), np.asarray(data[train, -1]),
+                np.asarray(data[test, :-1]), np.asarray(data[test, -1]))
+
+    def score(self, state: Tuple[np.ndarray, ...], params: Dict[str, Any]) -> float:
+        from regressions.log_regression import LogisticRegression, loss
+        features, groups, test_features, test_groups = state
+        model = LogisticRegression(**params)
+        model.train(features, groups)
+        probs = np.clip(model.predict(test_features), 1e-12, 1.0 - 1e-12)
+        return float(loss(probs, test_groups))
+
+
+def _k_means_class() -> type:
+    """
+    Класс KMeans из main/clustering. Модули кластеризации - скрипты, которые запускаются из своего каталога
+    и импортируют clustering_utils по имени файла, поэтому clustering_utils регистрируется под этим именем
+    из пакета clustering (sys.path не изменяется).
+    """
+    import clustering.clustering_utils
+    sys.modules.setdefault('clustering_utils', clustering.clustering_utils)
+    from clustering.k_means import KMeans
+    return KMeans
+
+
+class KMeansEvaluator:
+    """
+    Выбор количества кластеров KMeans (параметр "n_clusters").
+    data - строки с координатами точек. Ошибка - средний квадрат расстояния от точек тестовой части
+    до ближайшего центра кластера, построенного по обучающей части.
+    """
+    def prepare(self, data: np.ndarray, train: np.ndarray, test: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return np.asarray(data[train]), np.asarray(data[test])
+
+    def score(self, state: Tuple[np.ndarray, np.ndarray], params: Dict[str, Any]) -> float:
+        KMeans = _k_means_class()
+        train, test = state
+        k_means = KMeans(int(params["n_clusters"]))
+        k_means.fit(train)
+        centers = np.array(k_means.clusters_centers)
+        distances = ((test[:, np.newaxis, :] - centers[np.newaxis, :, :]) ** 2).sum(axis=-1)
+        return float(distances.min(axis=1).mean())
+
+
+def _params_grid(grid: ParamsGrid) -> List[Dict[str, Any]]:
+    names = list(grid.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def _run_fold(data: Union[np.ndarray, str], train: np.ndarray, test: np.ndarray,
+              evaluator: Any, params_list: List[Dict[str, Any]]) -> List[float]:
+    """
+    Оценка всех точек сетки на одном fold-е. data - массив или путь к .npy файлу,
+    который открывается как np.memmap (при работе в пуле процессов).
+    """
+    if isinstance(data, str):
+        data = np.load(data, mmap_mode='r')
+    state = evaluator.prepare(data, train, test)
+    return [evaluator.score(state, params) for params in params_list]
+
+
+def _results_table(grid: ParamsGrid, params_list: List[Dict[str, Any]], scores: np.ndarray) -> np.ndarray:
+    """
+    Структурированный массив: по строке на точку сетки, столбцы - параметры, mean_score, std_score, fold_scores
+    """
+    dtype = [(name, np.asarray(values).dtype) for name, values in grid.items()]
+    dtype += [("mean_score", float), ("std_score", float), ("fold_scores", float, (scores.shape[0],))]
+    table = np.zeros(len(params_list), dtype=dtype)
+    for name in grid:
+        table[name] = [params[name] for params in params_list]
+    table["mean_score"] = scores.mean(axis=0)
+    table["std_score"] = scores.std(axis=0)
+    table["fold_scores"] = scores.T
+    return table
+
+
+def cross_validation_sweep(data: np.ndarray, grid: ParamsGrid, evaluator: Any, n_folds: int = 5,
+                           n_processes: int = 1, rng: RandomSource = None) -> np.ndarray:
+    """
+    Перебор параметров по сетке с k-fold кросс-валидацией.
+    Пример:
+    x, y = Regression.test_data_along_cosh(n_points=10_000)
+    table = cross_validation_sweep(np.column_stack((x, y)), {"order": range(1, 10)}, PolyRegressionEvaluator(10))
+    best = table[table["mean_score"].argmin()]
+    :param data: данные, строки - точки
+    :param grid: имя параметра -> список значений
+    :param evaluator: оценщик (PolyRegressionEvaluator, LogisticRegressionEvaluator, KMeansEvaluator или свой)
+    :param n_folds: количество fold-ов
+    :param n_processes: количество процессов, между которыми делятся fold-ы
+    :param rng: генератор случайных чисел, seed или None (определяет разбиение на fold-ы)
+    :return: структурированный массив с полями параметров, mean_score, std_score и fold_scores
+    """
+    params_list = _params_grid(grid)
+    seed = int(np.random.default_rng(rng).integers(0, 2 ** 63 - 1))
+    # разбиение считается один раз, каждый fold получает только свои индексы
+    folds = k_fold_indices(np.shape(data)[0], n_folds, seed)
+    if n_processes <= 1:
+        scores = [_run_fold(data, train, test, evaluator, params_list) for train, test in folds]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.npy')
+            np.save(data_path, np.asarray(data))
+            with ProcessPoolExecutor(max_workers=min(n_processes, n_folds)) as executor:
+                futures = [executor.submit(_run_fold, data_path, train, test, evaluator, params_list)
+                           for train, test in folds]
+                scores = [future.result() for future in futures]
+    return _results_table(grid, params_list, np.array(scores, dtype=float))
+
+
+def poly_order_sweep_example():
+    x, y = Regression.test_data_along_cosh(arg_range=3.0, n_points=10_000)
+    table = cross_validation_sweep(np.column_stack((x, y)), {"order": range(1, 10)}, PolyRegressionEvaluator(10))
+    print("poly regression order sweep:")
+    for row in table:
+        print(f"order = {row['order']}: mse = {row['mean_score']:.6f} +- {row['std_score']:.6f}")
+    print(f"best order: {table[table['mean_score'].argmin()]['order']}")
+
+
+if __name__ == '__main__':
+    poly_order_sweep_example()
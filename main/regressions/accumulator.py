@@ -0,0 +1,235 @@
+from typing import Callable, Tuple, Union
+import numpy as np
+from regressions.solvers import solve_normal_equations
+from regressions.design_matrix import polynomial_design_matrix, polynomial_powers
+
+"""
+Накопитель достаточных статистик метода наименьших квадратов.
+Для модели y = (X, C), где X - вектор признаков точки, решение задачи Σ(yi - (Xi, C))^2 -> min
+выражается только через
+    X^T X = Σ Xi^T Xi  (матрица features x features)
+    X^T y = Σ Xi * yi  (вектор features)
+    n     - количество точек,
+которые можно накапливать блоками, объединять между независимыми частями данных
+и вычитать (скользящее окно). Пересчёт коэффициентов стоит O(features^3) и не зависит от N.
+"""
+
+FeaturesBuilder = Callable[[np.ndarray], np.ndarray]
+
+
+def _surface_features(order: int) -> FeaturesBuilder:
+    """
+    Признаки полиномиальной поверхности (см. regressions.design_matrix)
+    """
+    def features(args: np.ndarray) -> np.ndarray:
+        return polynomial_design_matrix(args, order)
+    return features
+
+
+def _poly_features(order: int) -> FeaturesBuilder:
+    """
+    Признаки [1, x, x^2,..., x^(order - 1)]
+    """
+    def features(args: np.ndarray) -> np.ndarray:
+        return np.vander(args[:, 0], order, increasing=True)
+    return features
+
+
+class RegressionAccumulator:
+    """
+    Онлайн-вариант регрессий из Regression. Хранит X^T X, X^T y, y^T y и n и позволяет в любой момент
+    получить коэффициенты модели методом solve.
+    Пример:
+    acc = RegressionAccumulator.linear()
+    for x, y in Regression.test_data_stream(Regression.test_data_along_line, 10_000_000):
+        acc.update(x, y)
+    k, b = acc.solve()
+    """
+    __slots__ = ('_features', '_n_args', '_xtx', '_xty', '_yty', '_n_points')
+
+    def __init__(self, features: FeaturesBuilder, n_args: int, n_features: int):
+        """
+        param: features: функция, строящая матрицу признаков (N x n_features) по аргументам точек (N x n_args)
+        param: n_args: количество аргументов одной точки
+        param: n_features: количество признаков (коэффициентов модели)
+        """
+        if n_args <= 0 or n_features <= 0:
+            raise ValueError(f"RegressionAccumulator :: incorrect args :\n"
+                             f"n_args    : {n_args},\n"
+                             f"n_features: {n_features}")
+        self._features = features
+        self._n_args = n_args
+        self._xtx = np.zeros((n_features, n_features), dtype=float)
+        self._xty = np.zeros(n_features, dtype=float)
+        self._yty = 0.0
+        self._n_points = 0
+
+    @staticmethod
+    def linear() -> 'RegressionAccumulator':
+        """
+        Аналог Regression.linear_regression: y = k * x + b, solve() -> [k, b]
+        """
+        return RegressionAccumulator.poly_surface(1, 1)
+
+    @staticmethod
+    def bi_linear() -> 'RegressionAccumulator':
+        """
+        Аналог Regression.bi_linear_regression: z = kx * x + ky * y + b, solve() -> [kx, ky, b]
+        """
+        return RegressionAccumulator.poly_surface(2, 1)
+
+    @staticmethod
+    def n_linear(n_args: int) -> 'RegressionAccumulator':
+        """
+        Аналог Regression.n_linear_regression: f = k_0 * x_0 +...+ k_n * x_n + b, solve() -> [k_0,..., k_n, b]
+        """
+        return RegressionAccumulator.poly_surface(n_args, 1)
+
+    @staticmethod
+    def quadratic_2d() -> 'RegressionAccumulator':
+        """
+        Аналог Regression.quadratic_regression_2d: z = a * x^2 + b * x * y + c * y^2 + d * x + e * y + f,
+        solve() -> [a, b, c, d, e, f]
+        """
+        return RegressionAccumulator.poly_surface(2, 2)
+
+    @staticmethod
+    def poly_surface(n_args: int, order: int) -> 'RegressionAccumulator':
+        """
+        Аналог Regression.poly_surface_regression: полиномиальная поверхность порядка order от n_args аргументов
+        """
+        return RegressionAccumulator(_surface_features(order), n_args, polynomial_powers(n_args, order).shape[0])
+
+    @staticmethod
+    def poly(order: int = 5) -> 'RegressionAccumulator':
+        """
+        Аналог Regression.poly_regression: y = Σx^i*bi, solve() -> [b_0,..., b_(order - 1)]
+        """
+        return RegressionAccumulator(_poly_features(order), 1, order)
+
+    @property
+    def n_points(self) -> int:
+        """
+        Количество точек, учтённых в статистиках
+        """
+        return self._n_points
+
+    @property
+    def n_features(self) -> int:
+        """
+        Количество коэффициентов модели
+        """
+        return self._xty.size
+
+    @property
+    def xtx(self) -> np.ndarray:
+        """
+        Матрица X^T X (только для чтения)
+        """
+        view = self._xtx.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def xty(self) -> np.ndarray:
+        """
+        Вектор X^T y (только для чтения)
+        """
+        view = self._xty.view()
+        view.flags.writeable = False
+        return view
+
+    def _split_chunk(self, chunk: np.ndarray, targets: Union[np.ndarray, None]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Разбивает блок данных на признаки и значения функции.
+        Если targets не задан, блок состоит из строк вида [x_0, x_1,..., x_n, f(x_0, x_1,..., x_n)]
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if targets is None:
+            if chunk.ndim != 2 or chunk.shape[1] != self._n_args + 1:
+                raise ValueError(f"RegressionAccumulator :: expected chunk to have shape (N, {self._n_args + 1}), "
+                                 f"but got {chunk.shape}")
+            args, targets = chunk[:, :-1], chunk[:, -1]
+        else:
+            args = chunk.reshape((-1, 1)) if chunk.ndim == 1 else chunk
+            targets = np.asarray(targets, dtype=float).ravel()
+            if args.shape != (targets.size, self._n_args):
+                raise ValueError(f"RegressionAccumulator :: expected args to have shape (N, {self._n_args}) "
+                                 f"and targets to have shape (N,), but got {args.shape} and {targets.shape}")
+        return self._features(args), targets
+
+    def _accumulate(self, features: np.ndarray, targets: np.ndarray, sign: float) -> None:
+        self._xtx += sign * (features.T @ features)
+        self._xty += sign * (features.T @ targets)
+        self._yty += sign * float(np.dot(targets, targets))
+        self._n_points += int(sign) * targets.size
+
+    def update(self, chunk: np.ndarray, targets: Union[np.ndarray, None] = None) -> 'RegressionAccumulator':
+        """
+        Добавляет блок точек.
+        :param chunk: строки вида [x_0,..., x_n, f(x_0,..., x_n)] или, если задан targets, аргументы точек
+        :param targets: значения функции в точках
+        :return: self
+        """
+        self._accumulate(*self._split_chunk(chunk, targets), 1.0)
+        return self
+
+    def downdate(self, chunk: np.ndarray, targets: Union[np.ndarray, None] = None) -> 'RegressionAccumulator':
+        """
+        Исключает ранее добавленный блок точек (например, вышедший из скользящего окна).
+        :param chunk: строки вида [x_0,..., x_n, f(x_0,..., x_n)] или, если задан targets, аргументы точек
+        :param targets: значения функции в точках
+        :return: self
+        """
+        features, targets = self._split_chunk(chunk, targets)
+        if targets.size > self._n_points:
+            raise ValueError(f"RegressionAccumulator :: unable to remove {targets.size} points "
+                             f"from accumulator with {self._n_points} points")
+        self._accumulate(features, targets, -1.0)
+        return self
+
+    def merge(self, other: 'RegressionAccumulator') -> 'RegressionAccumulator':
+        """
+        Добавляет статистики другого накопителя той же модели (например, посчитанного по другой части данных).
+        :param other: накопитель той же модели
+        :return: self
+        """
+        if not isinstance(other, RegressionAccumulator):
+            raise TypeError('incorrect value type in merging RegressionAccumulator')
+        if other._xtx.shape != self._xtx.shape or other._n_args != self._n_args:
+            raise ValueError("RegressionAccumulator :: unable to merge accumulators of different models")
+        self._xtx += other._xtx
+        self._xty += other._xty
+        self._yty += other._yty
+        self._n_points += other._n_points
+        return self
+
+    def reset(self) -> None:
+        """
+        Очищает накопленные статистики
+        """
+        self._xtx.fill(0.0)
+        self._xty.fill(0.0)
+        self._yty = 0.0
+        self._n_points = 0
+
+    def solve(self, method: str = "cholesky") -> np.ndarray:
+        """
+        Коэффициенты модели по накопленным статистикам: решение системы (X^T X) C = X^T y
+        :param method: метод решения системы: "cholesky", "qr" или "lstsq" (см. regressions.solvers)
+        :return: вектор коэффициентов C
+        """
+        if self._n_points < self.n_features:
+            raise ValueError(f"RegressionAccumulator :: {self._n_points} points are not enough "
+                             f"to fit {self.n_features} coefficients")
+        return solve_normal_equations(self._xtx, self._xty, method)
+
+    def residual_sum(self, coefficients: Union[np.ndarray, None] = None) -> float:
+        """
+        Сумма квадратов невязок Σ(yi - (Xi, C))^2 = y^T y - 2 * (C, X^T y) + C^T X^T X C
+        :param coefficients: коэффициенты модели, по умолчанию solve()
+        :return: сумма квадратов невязок
+        """
+        coefficients = self.solve() if coefficients is None else coefficients
+        value = self._yty - 2.0 * np.dot(coefficients, self._xty) + coefficients @ self._xtx @ coefficients
+        return max(float(value), 0.0)
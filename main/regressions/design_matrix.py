@@ -0,0 +1,99 @@
+from typing import Dict, Tuple, Union
+import numpy as np
+
+"""
+Построение матрицы признаков полиномиальных поверхностей произвольного порядка от n аргументов.
+Член полинома задаётся набором степеней аргументов (p_0, p_1,..., p_n), x_0^p_0 * x_1^p_1 *...* x_n^p_n.
+Порядок членов: по убыванию суммарной степени, внутри одной степени - по убыванию набора степеней.
+Например, для двух аргументов и order = 2:
+    [x^2, x * y, y^2, x, y, 1]
+а для n аргументов и order = 1:
+    [x_0, x_1,..., x_n, 1]
+что совпадает с порядком коэффициентов quadratic_regression_2d и n_linear_regression.
+"""
+
+_powers_cache: Dict[Tuple[int, int], np.ndarray] = {}
+
+
+def polynomial_powers(n_args: int, order: int) -> np.ndarray:
+    """
+    Таблица степеней членов полинома.
+    :param n_args: количество аргументов
+    :param order: максимальная суммарная степень
+    :return: массив (n_terms, n_args), строка - степени аргументов одного члена
+    """
+    key = (n_args, order)
+    if key not in _powers_cache:
+        if n_args <= 0 or order < 0:
+            raise ValueError(f"polynomial_powers :: incorrect args :\n"
+                             f"n_args: {n_args},\n"
+                             f"order : {order}")
+        grid = np.indices((order + 1,) * n_args).reshape((n_args, -1)).T
+        grid = grid[grid.sum(axis=1) <= order]
+        # сортировка: по убыванию степени, затем по убыванию набора степеней
+        keys = [grid[:, i] for i in range(n_args - 1, -1, -1)] + [grid.sum(axis=1)]
+        powers = grid[np.lexsort(keys)[::-1]]
+        powers.flags.writeable = False
+        _powers_cache[key] = powers
+    return _powers_cache[key]
+
+
+def polynomial_design_matrix(args: np.ndarray, order: int, out: Union[np.ndarray, None] = None) -> np.ndarray:
+    """
+    Матрица признаков полинома порядка order. Каждый столбец получается из столбца члена меньшей
+    степени одним умножением на аргумент, так что на член приходится одна векторная операция.
+    :param args: аргументы точек (N, n_args) или (N,) для одного аргумента
+    :param order: порядок полинома
+    :param out: необязательный буфер (N, n_terms) для результата
+    :return: матрица признаков (N, n_terms)
+    """
+    args = np.asarray(args, dtype=float)
+    args = args.reshape((-1, 1)) if args.ndim == 1 else args
+    n_points, n_args = args.shape
+    powers = polynomial_powers(n_args, order)
+    design = np.empty((n_points, powers.shape[0]), dtype=float) if out is None else out
+    if design.shape != (n_points, powers.shape[0]):
+        raise ValueError(f"polynomial_design_matrix :: expected out to have shape {(n_points, powers.shape[0])}, "
+                         f"but got {design.shape}")
+    columns = {tuple(p): i for i, p in enumerate(powers)}
+    # члены строятся от младших степеней к старшим, то есть с конца таблицы
+    for column in range(powers.shape[0] - 1, -1, -1):
+        term = powers[column]
+        if not term.any():
+            design[:, column] = 1.0
+            continue
+        arg = int(np.flatnonzero(term)[0])
+        parent = term.copy()
+        parent[arg] -= 1
+        np.multiply(design[:, columns[tuple(parent)]], args[:, arg], out=design[:, column])
+    return design
+
+
+def polynomial_normal_equations(args: np.ndarray, targets: np.ndarray, order: int,
+                                chunk_size: int = 1 << 18) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Матрица X^T X и вектор X^T y для полинома порядка order без построения полной матрицы признаков.
+    Точки обрабатываются блоками по chunk_size, для каждого блока [X | y]^T [X | y] считается одним
+    матричным произведением.
+    :param args: аргументы точек (N, n_args) или (N,)
+    :param targets: значения функции (N,)
+    :param order: порядок полинома
+    :param chunk_size: количество точек в одном блоке
+    :return: пара (X^T X, X^T y)
+    """
+    args = np.asarray(args, dtype=float)
+    args = args.reshape((-1, 1)) if args.ndim == 1 else args
+    targets = np.asarray(targets, dtype=float).ravel()
+    if args.shape[0] != targets.size:
+        raise ValueError(f"polynomial_normal_equations :: expected args to have shape (N, n_args) and targets "
+                         f"to have shape (N,), but got {args.shape} and {targets.shape}")
+    n_terms = polynomial_powers(args.shape[1], order).shape[0]
+    gram = np.zeros((n_terms + 1, n_terms + 1), dtype=float)
+    buffer = np.empty((min(chunk_size, targets.size), n_terms + 1), dtype=float)
+    for start in range(0, targets.size, chunk_size):
+        stop = min(start + chunk_size, targets.size)
+        block = buffer[:stop - start]
+        polynomial_design_matrix(args[start:stop], order, out=block[:, :n_terms])
+        block[:, n_terms] = targets[start:stop]
+        gram += block.T @ block
+    return gram[:n_terms, :n_terms], gram[:n_terms, n_terms]
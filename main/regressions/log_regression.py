@@ -1,9 +1,7 @@
 from typing import Tuple, Callable, Union, List
-import matplotlib.pyplot as plt
-from scipy.stats import logistic
 import numpy as np
 import random
-import keras
+from regressions.regression import Regression, RandomSource
 
 """
 Пусть есть два события связаны соотношением:
@@ -39,6 +37,8 @@ Vector2Int = Tuple[int, int]
 Vector2 = Tuple[float, float]
 Section = Tuple[Vector2, Vector2]
 EmptyArray = np.ndarray([])
+# scipy.special.expit, импортируется лениво в sigmoid
+_expit = None
 
 
 def march_squares_2d(field: Callable[[float, float], float],
@@ -182,11 +182,16 @@ def rand_in_range(rand_range: Union[float, Tuple[float, float]] = 1.0) -> float:
     return random.uniform(-0.5, 0.5)
 
 
-def ellipsoid(x: float, y: float, params: Tuple[float, float, float, float, float]) -> float:
+# векторный аналог rand_in_range - общий с Regression
+rand_array_in_range = Regression.rand_array_in_range
+
+
+def ellipsoid(x: Union[float, np.ndarray], y: Union[float, np.ndarray],
+              params: Tuple[float, float, float, float, float]) -> Union[float, np.ndarray]:
     """
     уравнение эллипсойда
-    :param x: координата по х
-    :param y: координата по y
+    :param x: координата по х (число или массив)
+    :param y: координата по y (число или массив)
     :param params: расстояние от точки (x,y) до эллипсоида f(x, y), f(x, y) = 0 <- точка принадлежит эллипсоиду
     :return: значение уравнения эллипсоида в точке
     """
@@ -195,13 +200,14 @@ def ellipsoid(x: float, y: float, params: Tuple[float, float, float, float, floa
 
 def log_reg_ellipsoid_test_data(params: Tuple[float, float, float, float, float],
                                 arg_range: float = 5.0, rand_range: float = 1.0,
-                                n_points: int = 3000) -> Tuple[np.ndarray, np.ndarray]:
+                                n_points: int = 3000, rng: RandomSource = None) -> Tuple[np.ndarray, np.ndarray]:
     """
     Генератор тестовых данных для логистической регрессии для эллипсоида. Чтобы понять что тут просходит, просто  _debug_mode = True
     :param params:
     :param arg_range:
     :param rand_range:
     :param n_points:
+    :param rng: генератор случайных чисел, seed или None
     :return:
     """
     if _debug_mode:
@@ -209,19 +215,18 @@ def log_reg_ellipsoid_test_data(params: Tuple[float, float, float, float, float]
               f" {params[3]:1.3}x^2 + {params[4]:1.3}y^2 - 1,\n"
               f" arg_range =  [{-arg_range * 0.5:1.3}, {arg_range * 0.5:1.3}],\n"
               f" rand_range = [{-rand_range * 0.5:1.3}, {rand_range * 0.5:1.3}]")
-    features = np.zeros((n_points, 5), dtype=float)
-    features[:, 0] = np.array([rand_in_range(arg_range) for _ in range(n_points)])
-    features[:, 1] = np.array([rand_in_range(arg_range) for _ in range(n_points)])
-    features[:, 2] = features[:, 0] * features[:, 1]
-    features[:, 3] = features[:, 0] * features[:, 0]
-    features[:, 4] = features[:, 1] * features[:, 1]
-    groups = np.array(
-        [np.sign(ellipsoid(features[i, 0], features[i, 1], params)) * 0.5 + 0.5 for i in range(n_points)])
+    features = np.empty((n_points, 5), dtype=float)
+    features[:, :2] = np.random.default_rng(rng).uniform(-0.5 * arg_range, 0.5 * arg_range, (n_points, 2))
+    np.multiply(features[:, 0], features[:, 1], out=features[:, 2])
+    np.multiply(features[:, 0], features[:, 0], out=features[:, 3])
+    np.multiply(features[:, 1], features[:, 1], out=features[:, 4])
+    groups = np.sign(ellipsoid(features[:, 0], features[:, 1], params)) * 0.5 + 0.5
     return features, groups
 
 
 def log_reg_test_data(k: float = -1.5, b: float = 0.1, arg_range: float = 1.0,
-                      rand_range: float = 0.0, n_points: int = 3000) -> Tuple[np.ndarray, np.ndarray]:
+                      rand_range: float = 0.0, n_points: int = 3000,
+                      rng: RandomSource = None) -> Tuple[np.ndarray, np.ndarray]:
     """
     Генератор тестовых данных для логистической регрессии прямой. Чтобы понять что тут просходит, просто  _debug_mode = True
     :param k:
@@ -229,26 +234,32 @@ def log_reg_test_data(k: float = -1.5, b: float = 0.1, arg_range: float = 1.0,
     :param arg_range:
     :param rand_range:
     :param n_points:
+    :param rng: генератор случайных чисел, seed или None
     :return:
     """
     if _debug_mode:
         print(f"logistic regression test data b = {b:1.3}, k = {k:1.3},\n"
               f" arg_range = [{-arg_range * 0.5:1.3}, {arg_range * 0.5:1.3}],\n"
               f" rand_range = [{-rand_range * 0.5:1.3}, {rand_range * 0.5:1.3}]")
-    features = np.zeros((n_points, 2), dtype=float)
-    features[:, 0] = np.array([rand_in_range(arg_range) for _ in range(n_points)])
-    features[:, 1] = np.array([rand_in_range(arg_range) for _ in range(n_points)])
-    groups = np.array(
-        [1 if features[i, 0] * k + b > features[i, 1] + rand_in_range(rand_range) else 0.0 for i in range(n_points)])
+    rng = np.random.default_rng(rng)
+    features = rng.uniform(-0.5 * arg_range, 0.5 * arg_range, (n_points, 2))
+    noise = rand_array_in_range(rand_range, n_points, rng)
+    groups = (features[:, 0] * k + b > features[:, 1] + noise).astype(float)
     return features, groups
 
 
 def sigmoid(x: np.ndarray) -> np.ndarray:
     """
+    Логистическая функция 1 / (1 + exp{-x}).
+    scipy подгружается при первом вызове, а не при импорте модуля.
     :param x:
     :return:
     """
-    return logistic.cdf(x)
+    global _expit
+    if _expit is None:
+        from scipy.special import expit
+        _expit = expit
+    return _expit(x)
 
 
 def loss(groups_probs, groups):
@@ -269,6 +280,7 @@ def draw_logistic_data(features: np.ndarray, groups: np.ndarray, theta: np.ndarr
     :param theta:
     :return:
     """
+    import matplotlib.pyplot as plt
     [plt.plot(features[i, 0], features[i, 1], '+b') if groups[i] == 0
      else plt.plot(features[i, 0], features[i, 1], '*r') for i in range(features.shape[0] // 2)]
 
@@ -441,6 +453,7 @@ def lin_reg_test():
 
 
 def non_lin_reg_test():
+    import matplotlib.pyplot as plt
     features, group = log_reg_ellipsoid_test_data((0.08, -0.08, 1.6, 1.0, 1.0))
     lg = LogisticRegression()
     print(features.shape)
@@ -466,6 +479,7 @@ def non_lin_reg_test():
 
 
 def lin_keras_test():
+    import keras
     features, group = log_reg_test_data()
 
     model = keras.Sequential()
@@ -481,6 +495,8 @@ def lin_keras_test():
 
 
 def non_lin_keras_test():
+    import matplotlib.pyplot as plt
+    import keras
     features, group = log_reg_ellipsoid_test_data((0.08, -0.08, 1.6, 1.0, 1.0))
 
     model = keras.Sequential()
@@ -1,7 +1,12 @@
-import matplotlib.pyplot as plt
-from typing import Tuple, Union
+from typing import Tuple, Union, Callable, Iterator
 import numpy as np
 import random
+from regressions.solvers import least_squares, solve_normal_equations
+from regressions.design_matrix import polynomial_design_matrix, polynomial_normal_equations
+
+# источник случайности для генераторов тестовых данных: np.random.Generator, seed или None
+RandomSource = Union[np.random.Generator, int, None]
+DataChunk = Union[np.ndarray, Tuple[np.ndarray, ...]]
 
 
 # class DataGenerator(namedtuple("DataGenerator", "dimension, args_min, args_max, args_step, generator_func")):
@@ -19,9 +24,35 @@ class Regression:
             return random.uniform(rand_range[0], rand_range[1])
         return random.uniform(-0.5, 0.5)
 
+    @staticmethod
+    def rand_array_in_range(rand_range: Union[float, Tuple[float, float]] = 1.0, n_points: int = 1,
+                            rng: RandomSource = None) -> np.ndarray:
+        """
+        Векторный аналог rand_in_range: массив из n_points равномерно распределённых значений
+        :param rand_range: ширина диапазона с центром в нуле или границы диапазона (min, max)
+        :param n_points: количество значений
+        :param rng: генератор случайных чисел, seed или None
+        :return: массив значений
+        """
+        rng = np.random.default_rng(rng)
+        if isinstance(rand_range, tuple):
+            return rng.uniform(rand_range[0], rand_range[1], n_points)
+        if isinstance(rand_range, (int, float)):
+            return rng.uniform(-0.5 * rand_range, 0.5 * rand_range, n_points)
+        return rng.uniform(-0.5, 0.5, n_points)
+
+    @staticmethod
+    def _line_args(arg_range: float, n_points: int, index_range: Union[Tuple[int, int], None]) -> np.ndarray:
+        """
+        Равномерная сетка аргументов i * arg_range / (n_points - 1), i in [index_range[0], index_range[1])
+        """
+        start, stop = (0, n_points) if index_range is None else index_range
+        return np.arange(start, stop, dtype=float) * (arg_range / (n_points - 1))
+
     @staticmethod
     def test_data_along_line(k: float = 1.0, b: float = 0.1, arg_range: float = 1.0,
-                             rand_range: float = 0.05, n_points: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+                             rand_range: float = 0.05, n_points: int = 100, rng: RandomSource = None,
+                             index_range: Union[Tuple[int, int], None] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         Генерирует линию вида y = k * x + b + dy, где dy - аддитивный шум с амплитудой half_disp
         :param k: наклон линии
@@ -29,32 +60,41 @@ class Regression:
         :param arg_range: диапазон аргумента от 0 до arg_range
         :param rand_range: диапазон шума данных
         :param n_points: количество точек
+        :param rng: генератор случайных чисел, seed или None
+        :param index_range: если задан, возвращаются только точки с номерами из [start, stop)
         :return: кортеж значений по x и y
         """
-        x_step = arg_range / (n_points - 1)
-        return np.array([i * x_step for i in range(n_points)]),\
-               np.array([i * x_step * k + b + Regression.rand_in_range(rand_range) for i in range(n_points)])
+        x = Regression._line_args(arg_range, n_points, index_range)
+        y = Regression.rand_array_in_range(rand_range, x.size, rng)
+        y += k * x
+        y += b
+        return x, y
 
+    @staticmethod
     def test_data_along_cosh(k: float = 1.0, b: float = 0.1, arg_range: float = 1.0,
-                             rand_range: float = 0.05, n_points: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+                             rand_range: float = 0.05, n_points: int = 100, rng: RandomSource = None,
+                             index_range: Union[Tuple[int, int], None] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Генерирует линию вида y = k * x + b + dy, где dy - аддитивный шум с амплитудой half_disp
-        :param k: наклон линии
-        :param b: смещение по y
+        Генерирует кривую вида y = cosh(x) + dy, где dy - аддитивный шум с амплитудой half_disp
+        :param k: не используется
+        :param b: не используется
         :param arg_range: диапазон аргумента от 0 до arg_range
         :param rand_range: диапазон шума данных
         :param n_points: количество точек
+        :param rng: генератор случайных чисел, seed или None
+        :param index_range: если задан, возвращаются только точки с номерами из [start, stop)
         :return: кортеж значений по x и y
         """
-        x_step = arg_range / (n_points - 1)
-        return np.array([i * x_step for i in range(n_points)]),\
-               np.array([np.cosh(i * x_step) + Regression.rand_in_range(rand_range) for i in range(n_points)])
+        x = Regression._line_args(arg_range, n_points, index_range)
+        y = Regression.rand_array_in_range(rand_range, x.size, rng)
+        y += np.cosh(x)
+        return x, y
 
     @staticmethod
     def second_order_surface_2d(surf_params:
                                 Tuple[float, float, float, float, float, float] = (1.0, -2.0, 3.0, 1.0, 2.0, -3.0),
-                                args_range: float = 1.0, rand_range: float = .1, n_points: int = 1000) -> \
-                                Tuple[np.ndarray, np.ndarray, np.ndarray]:
+                                args_range: float = 1.0, rand_range: float = .1, n_points: int = 1000,
+                                rng: RandomSource = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Генерирует набор тестовых данных около поверхности второго порядка.
         Уравнение поверхности:
@@ -64,17 +104,22 @@ class Regression:
         :param args_range x in [x0, x1], y in [y0, y1]:
         :param rand_range:
         :param n_points:
+        :param rng: генератор случайных чисел, seed или None
         :return:
         """
-        x = np.array([Regression.rand_in_range(args_range) for _ in range(n_points)])
-        y = np.array([Regression.rand_in_range(args_range) for _ in range(n_points)])
-        dz = np.array([surf_params[5] + Regression.rand_in_range(rand_range) for _ in range(n_points)])
-        return x, y, surf_params[0] * x * x + surf_params[1] * y * x + surf_params[2] * y * y + \
-               surf_params[3] * x + surf_params[4] * y + dz
+        rng = np.random.default_rng(rng)
+        x = Regression.rand_array_in_range(args_range, n_points, rng)
+        y = Regression.rand_array_in_range(args_range, n_points, rng)
+        z = Regression.rand_array_in_range(rand_range, n_points, rng)
+        z += surf_params[5]
+        z += (surf_params[0] * x + surf_params[1] * y + surf_params[3]) * x
+        z += (surf_params[2] * y + surf_params[4]) * y
+        return x, y, z
 
     @staticmethod
     def test_data_2d(kx: float = -2.0, ky: float = 2.0, b: float = 12.0, args_range: float = 1.0,
-                     rand_range: float = 1.0, n_points: int = 100) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+                     rand_range: float = 1.0, n_points: int = 100,
+                     rng: RandomSource = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Генерирует плоскость вида z = kx*x + ky*x + b + dz, где dz - аддитивный шум в диапазоне rand_range
         :param kx: наклон плоскости по x
@@ -83,33 +128,67 @@ class Regression:
         :param args_range: диапазон аргументов по кажой из осей от 0 до args_range
         :param rand_range: диапазон шума данных
         :param n_points: количество точек
+        :param rng: генератор случайных чисел, seed или None
         :returns: кортеж значенией по x, y и z
         """
-        x = np.array([Regression.rand_in_range(args_range) for _ in range(n_points)])
-        y = np.array([Regression.rand_in_range(args_range) for _ in range(n_points)])
-        dz = np.array([b + Regression.rand_in_range(rand_range) for _ in range(n_points)])
-        return x, y, x * kx + y * ky + dz
+        rng = np.random.default_rng(rng)
+        x = Regression.rand_array_in_range(args_range, n_points, rng)
+        y = Regression.rand_array_in_range(args_range, n_points, rng)
+        z = Regression.rand_array_in_range(rand_range, n_points, rng)
+        z += b
+        z += x * kx
+        z += y * ky
+        return x, y, z
 
     @staticmethod
     def test_data_nd(surf_settings: np.ndarray = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 12.0]), args_range: float = 1.0,
-                     rand_range: float = 0.1, n_points: int = 125) -> np.ndarray:
+                     rand_range: float = 0.1, n_points: int = 125, rng: RandomSource = None) -> np.ndarray:
         """
         Генерирует плоскость вида z = k_0*x_0 + k_1*x_1...,k_n*x_n + d + dz, где dz - аддитивный шум в диапазоне rand_range
         :param surf_settings: параметры плоскости в виде k_0,k_1,...,k_n,d
         :param args_range: диапазон аргументов по кажой из осей от 0 до args_range
         :param n_points: количество точек
         :param rand_range: диапазон шума данных
+        :param rng: генератор случайных чисел, seed или None
         :returns: массив из строк вида x_0, x_1,...,x_n, f(x_0, x_1,...,x_n)
         """
+        rng = np.random.default_rng(rng)
         n_dims = surf_settings.size - 1
-        data = np.zeros((n_points, n_dims + 1,), dtype=float)
-        for i in range(n_dims):
-            data[:, i] = np.array([Regression.rand_in_range(args_range) for _ in range(n_points)])
-            data[:, n_dims] += surf_settings[i] * data[:, i]
-        dz = np.array([surf_settings[n_dims] + Regression.rand_in_range(rand_range) for _ in range(n_points)])
-        data[:, n_dims] += dz
+        data = np.empty((n_points, n_dims + 1,), dtype=float)
+        data[:, :n_dims] = rng.uniform(-0.5 * args_range, 0.5 * args_range, (n_points, n_dims))
+        data[:, n_dims] = Regression.rand_array_in_range(rand_range, n_points, rng)
+        data[:, n_dims] += surf_settings[n_dims]
+        data[:, n_dims] += data[:, :n_dims] @ surf_settings[:n_dims]
         return data
 
+    @staticmethod
+    def test_data_stream(generator: Callable[..., DataChunk], n_points: int, chunk_size: int = 1 << 16,
+                         rng: RandomSource = None, **params) -> Iterator[DataChunk]:
+        """
+        Потоковая генерация тестовых данных блоками по chunk_size точек (последний блок может быть короче).
+        Все данные целиком в памяти не создаются.
+        Пример:
+        for x, y in Regression.test_data_stream(Regression.test_data_along_line, 10_000_000, k=2.0):
+            ...
+        :param generator: любой из генераторов тестовых данных (test_data_along_line, test_data_2d, ...)
+        :param n_points: общее количество точек
+        :param chunk_size: количество точек в одном блоке
+        :param rng: генератор случайных чисел, seed или None
+        :param params: параметры генератора
+        :return: итератор по блокам данных в формате генератора
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"test_data_stream:: chunk_size must be positive, got {chunk_size}")
+        rng = np.random.default_rng(rng)
+        # для линии и cosh аргумент - равномерная сетка по всем n_points, поэтому блоку передаётся его срез
+        along_grid = generator in (Regression.test_data_along_line, Regression.test_data_along_cosh)
+        for start in range(0, n_points, chunk_size):
+            stop = min(start + chunk_size, n_points)
+            if along_grid:
+                yield generator(n_points=n_points, rng=rng, index_range=(start, stop), **params)
+            else:
+                yield generator(n_points=stop - start, rng=rng, **params)
+
     @staticmethod
     def distance_sum(x: np.ndarray, y: np.ndarray, k: float, b: float) -> float:
         """
@@ -121,21 +200,93 @@ class Regression:
         :param b: значение параметра b (смещение)
         :returns: F(k, b) = (Σ(yi -(k * xi + b))^2)^0.5
         """
-        return np.sqrt(np.power((y - x * k + b), 2.0).sum())
+        return np.sqrt(np.power((y - x * k - b), 2.0).sum())
 
     @staticmethod
-    def distance_field(x: np.ndarray, y: np.ndarray, k: np.ndarray, b: np.ndarray) -> np.ndarray:
+    def line_moments(x: np.ndarray, y: np.ndarray) -> Tuple[int, float, float, float, float, float]:
+        """
+        Центрированные моменты набора точек, через которые выражается Σ(yi -(k * xi + b))^2 для любых k и b:
+        n, x_mean, y_mean, Sxx = Σ(xi - x_mean)^2, Sxy = Σ(xi - x_mean)(yi - y_mean), Syy = Σ(yi - y_mean)^2
+        :param x: массив значений по x
+        :param y: массив значений по y
+        :returns: кортеж (n, x_mean, y_mean, Sxx, Sxy, Syy)
+        """
+        n = x.size
+        x_mean = x.mean()
+        y_mean = y.mean()
+        dx = x - x_mean
+        dy = y - y_mean
+        return n, x_mean, y_mean, np.dot(dx, dx), np.dot(dx, dy), np.dot(dy, dy)
+
+    @staticmethod
+    def _distance_field_moments(moments: Tuple[int, float, float, float, float, float],
+                                k: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Поле расстояний по моментам line_moments:
+        Σ(yi - k * xi - b)^2 = Syy - 2 * k * Sxy + k^2 * Sxx + n * (y_mean - k * x_mean - b)^2
+        """
+        n, x_mean, y_mean, s_xx, s_xy, s_yy = moments
+        spread = (s_xx * k - 2.0 * s_xy) * k + s_yy
+        shift = (y_mean - k * x_mean)[np.newaxis, :] - b[:, np.newaxis]
+        field = shift * shift
+        field *= n
+        field += spread
+        np.maximum(field, 0.0, out=field)
+        return np.sqrt(field, out=field)
+
+    @staticmethod
+    def _distance_field_loss(x: np.ndarray, y: np.ndarray, k: np.ndarray, b: np.ndarray,
+                             loss: Callable[[np.ndarray], np.ndarray], chunk_size: int) -> np.ndarray:
+        """
+        Поле Σloss(yi - k * xi - b) прямым вычислением. Точки обрабатываются блоками так,
+        чтобы временный массив невязок содержал не более chunk_size элементов.
+        """
+        field = np.zeros((b.size, k.size), dtype=float)
+        n_chunk = max(1, chunk_size // field.size)
+        for start in range(0, x.size, n_chunk):
+            residuals = y[np.newaxis, start: start + n_chunk] - k[:, np.newaxis] * x[np.newaxis, start: start + n_chunk]
+            residuals = residuals[np.newaxis, :, :] - b[:, np.newaxis, np.newaxis]
+            field += loss(residuals).sum(axis=-1)
+        return field
+
+    @staticmethod
+    def distance_field(x: np.ndarray, y: np.ndarray, k: np.ndarray, b: np.ndarray,
+                       loss: Union[Callable[[np.ndarray], np.ndarray], None] = None,
+                       chunk_size: int = 1 << 22, n_threads: int = 1) -> np.ndarray:
         """
         Вычисляет сумму квадратов расстояний от набора точек до линии вида y = k*x + b, где k и b являются диапазонами
         значений. Формула расстояния для j-ого значения из набора k и k-ого значения из набора b:
         F(k_j, b_k) = (Σ(yi -(k_j * xi + b_k))^2)^0.5 (суммирование по i)
+        Сумма раскладывается по моментам точек (см. line_moments), поэтому поле считается за O(N + len(k) * len(b)).
+        Если задана функция потерь loss, то считается поле F(k_j, b_k) = Σloss(yi -(k_j * xi + b_k)) прямым
+        вычислением по блокам.
         :param x: массив значений по x
         :param y: массив значений по y
         :param k: массив значений параметра k (наклоны)
         :param b: массив значений параметра b (смещения)
-        :returns: поле расстояний вида F(k, b) = (Σ(yi -(k * xi + b))^2)^0.5 (суммирование по i)
-        """
-        return np.array([[Regression.distance_sum(x, y, k_i, b_i) for k_i in k.flat] for b_i in b.flat])
+        :param loss: поэлементная функция потерь от массива невязок или None для (Σ(yi -(k * xi + b))^2)^0.5
+        :param chunk_size: максимальное количество элементов во временном массиве невязок (только для loss)
+        :param n_threads: количество потоков, между которыми делятся строки поля (по b)
+        :returns: поле расстояний вида F(k, b) = (Σ(yi -(k * xi + b))^2)^0.5 (суммирование по i), размер len(b) x len(k)
+        """
+        k = np.asarray(k, dtype=float).ravel()
+        b = np.asarray(b, dtype=float).ravel()
+        if loss is None:
+            moments = Regression.line_moments(x, y)
+
+            def field_tile(b_tile: np.ndarray) -> np.ndarray:
+                return Regression._distance_field_moments(moments, k, b_tile)
+        else:
+            def field_tile(b_tile: np.ndarray) -> np.ndarray:
+                return Regression._distance_field_loss(x, y, k, b_tile, loss, chunk_size)
+
+        if n_threads <= 1 or b.size < 2:
+            return field_tile(b)
+
+        from concurrent.futures import ThreadPoolExecutor
+        tiles = np.array_split(b, min(n_threads, b.size))
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            return np.vstack(list(executor.map(field_tile, tiles)))
 
     @staticmethod
     def linear_regression(x: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
@@ -180,7 +331,8 @@ class Regression:
         return k, b
 
     @staticmethod
-    def bi_linear_regression(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> Tuple[float, float, float]:
+    def bi_linear_regression(x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                             method: str = "cholesky") -> Tuple[float, float, float]:
         """
         Билинейная регрессия.\n
         Основные формулы:\n
@@ -229,29 +381,22 @@ class Regression:
         |kx|   |1|\n
         |ky| = |1| -  H(1, 1, 0)^-1 * grad(1, 1, 0)\n
         | b|   |0|\n
+        что равносильно решению системы H * (kx, ky, b)^T = (Σ xi*zi, Σ yi*zi, Σ zi)^T\n
 
         :param x: массив значений по x
         :param y: массив значений по y
         :param z: массив значений по z
+        :param method: метод решения системы: "cholesky", "qr" или "lstsq" (см. regressions.solvers)
         :returns: возвращает тройку (kx, ky, b), которая является решением задачи (Σ(zi - (yi * ky + xi * kx + b))^2)->min
         """
-        hesse = ([np.sum((x * x)), np.sum((x * y)), np.sum(x)],
-                [np.sum((x* y)), np.sum((y*  y)), np.sum(y)],
-                [np.sum(x),   np.sum(y),   x.size])
-
-        hesseInv = np.linalg.inv(hesse)
-        # def grad(kx, ky, b):
-        #     return [sum(np.multiply(-z, x) + ky * np.multiply(x, y) + kx * np.multiply(x, x) + b*x),
-        #                  sum(np.multiply(-z, y) + ky * np.multiply(y, y) + kx * np.multiply(x, y) + b*y),
-        #                  sum(-z + y*ky + x*kx)]
-        grad = ([np.sum((-z* x) + (x* y) + (x* x)),
-                         np.sum((-z* y) + (y* y) + (x* y)),
-                         np.sum(-z + y + x)])
+        hesse = np.array([[np.dot(x, x), np.dot(x, y), np.sum(x)],
+                          [np.dot(x, y), np.dot(y, y), np.sum(y)],
+                          [np.sum(x),    np.sum(y),    x.size]])
 
-        return np.array([1, 1, 0]) - np.dot(hesseInv, grad)
+        return solve_normal_equations(hesse, np.array([np.dot(x, z), np.dot(y, z), np.sum(z)]), method)
 
     @staticmethod
-    def n_linear_regression(data_rows: np.ndarray) -> np.ndarray:
+    def n_linear_regression(data_rows: np.ndarray, method: str = "cholesky") -> np.ndarray:
         """
         H_ij = Σx_i * x_j, i in [0, rows - 1] , j in [0, rows - 1]
         H_ij = Σx_i, j = rows i in [rows, :]
@@ -267,37 +412,17 @@ class Regression:
         grad = | Σ xi * yi + Σ yi^2    - Σzi * yi|\n
                | Σxi       + Σ yi      - Σzi     |\n
 
+        x_0 - H^-1 * grad(x_0) = H^-1 * (Σ x_0 * f,..., Σ x_n * f, Σ f), поэтому решается система
+        H * C = (Σ x_0 * f,..., Σ x_n * f, Σ f) без обращения H
+
         :param data_rows:  состоит из строк вида: [x_0,x_1,...,x_n, f(x_0,x_1,...,x_n)]
+        :param method: метод решения системы: "cholesky", "qr" или "lstsq" (см. regressions.solvers)
         :return:
         """
-        s_rows, s_cols = data_rows.shape
-
-        hessian = np.zeros((s_cols, s_cols), dtype=float)
-
-        grad = np.zeros(s_cols, dtype=float)
-
-        x_0 = np.zeros(s_cols, dtype=float)
-
-        for row in range(s_cols - 1):
-            x_0[row] = 1.0
-            for col in range(row + 1):
-                hessian[row, col] = hessian[col, row] = np.sum(data_rows[:, row] @ data_rows[:, col])
-            value = np.sum(data_rows[:, row])
-            hessian[row, -1] = hessian[-1, row] = value
-
-
-
-        hessian[-1, -1] = data_rows.shape[0]
-
-        for row in range(s_cols - 1):
-            grad[row] = np.sum(hessian[row, :-1]) - np.dot(data_rows[:, -1], data_rows[:, row])
-
-        grad[-1] = np.sum(hessian[-1, :-1]) - np.sum(data_rows[:, -1])
-
-        return x_0 - np.linalg.inv(hessian) @ grad
+        return Regression.poly_surface_regression(data_rows[:, :-1], data_rows[:, -1], 1, method)
 
     @staticmethod
-    def poly_regression(x: np.ndarray, y: np.ndarray, order: int = 5) -> np.ndarray:
+    def poly_regression(x: np.ndarray, y: np.ndarray, order: int = 5, method: str = "cholesky") -> np.ndarray:
         """
         Полином: y = Σ_j x^j * bj
         Отклонение: ei = yi - Σ_j xi^j * bj
@@ -307,40 +432,179 @@ class Regression:
         :param x: массив значений по x
         :param y: массив значений по y
         :param order: порядок полинома
+        :param method: метод решения: "cholesky", "qr" или "lstsq" (см. regressions.solvers).
+                       y может быть матрицей (N, K) - тогда за один вызов находятся коэффициенты K полиномов
         :return: набор коэффициентов bi полинома y = Σx^i*bi
         """
+        return least_squares(np.vander(x, order, increasing=True), y, method)
 
-        n = x.size
-        Xm = np.zeros((n, order))
-        Xm[:, 0] = 1
+    @staticmethod
+    def _series_layout(x: np.ndarray, y: np.ndarray, offsets: Union[np.ndarray, None]) -> \
+            Tuple[np.ndarray, np.ndarray, Union[np.ndarray, None], np.ndarray]:
+        """
+        Проверка входных данных пакетных регрессий.
+        Ряды задаются либо матрицами x, y размера (series, points), либо одномерными массивами
+        всех рядов подряд и границами рядов offsets: ряд i - это x[offsets[i]:offsets[i + 1]].
+        :returns: x, y, offsets и количество точек в каждом ряду
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if x.shape != y.shape:
+            raise ValueError(f"Error when checking : expected x and y to have the same shape, "
+                             f"but got {x.shape} and {y.shape}")
+        if offsets is None:
+            if x.ndim != 2 or x.shape[1] == 0:
+                raise ValueError(f"Error when checking : expected x to have shape (series, points), but got {x.shape}")
+            return x, y, None, np.full(x.shape[0], x.shape[1])
+        offsets = np.asarray(offsets, dtype=np.int64)
+        counts = np.diff(offsets)
+        if x.ndim != 1 or offsets.ndim != 1 or offsets.size < 2 or offsets[0] != 0 or offsets[-1] != x.size \
+                or np.any(counts <= 0):
+            raise ValueError("Error when checking : expected 1d x, y and non-empty series bounds "
+                             "offsets = [0, ..., x.size]")
+        return x, y, offsets, counts
 
-        for i in range(1, order):
-            Xm[:, i] = Xm[:, i - 1] * x
+    @staticmethod
+    def _series_sums(values: np.ndarray, offsets: Union[np.ndarray, None]) -> np.ndarray:
+        """
+        Суммы values по точкам каждого ряда (см. _series_layout). Лишние измерения values сохраняются.
+        """
+        if offsets is None:
+            return values.sum(axis=1)
+        return np.add.reduceat(values, offsets[:-1], axis=0)
 
-        XmT = np.transpose(Xm)
+    @staticmethod
+    def _series_distinct_counts(x: np.ndarray, offsets: Union[np.ndarray, None]) -> np.ndarray:
+        """
+        Количество различных значений x в каждом ряду (см. _series_layout).
+        Ряд, в котором различных x меньше порядка полинома, даёт вырожденную систему нормальных уравнений.
+        """
+        if offsets is None:
+            return 1 + np.count_nonzero(np.diff(np.sort(x, axis=1), axis=1), axis=1)
+        counts = np.diff(offsets)
+        series = np.repeat(np.arange(counts.size), counts)
+        values = x[np.lexsort((x, series))]
+        is_new = np.ones(x.size, dtype=np.int64)
+        is_new[1:] = values[1:] != values[:-1]
+        is_new[offsets[:-1]] = 1
+        return np.add.reduceat(is_new, offsets[:-1])
 
-        x1 = np.linalg.inv(np.dot(XmT, Xm))
-        x2 = np.dot(x1, XmT)
-        x3 = np.dot(x2, y)
+    @staticmethod
+    def batch_linear_regression(x: np.ndarray, y: np.ndarray,
+                                offsets: Union[np.ndarray, None] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Линейная регрессия y = k*x + b сразу для множества независимых рядов.
+        По формулам linear_regression через центрированные суммы:
+        k = Σ(xi - x_mean)*(yi - y_mean) / Σ(xi - x_mean)^2
+        b = y_mean - k * x_mean
+        :param x: значения по x: матрица (series, points) или все ряды подряд (если задан offsets)
+        :param y: значения по y той же формы
+        :param offsets: границы рядов [0, ..., x.size] для рядов разной длины
+        Для рядов с одинаковыми x (вырожденная задача) возвращается решение с минимальной нормой (k, b),
+        как у np.linalg.lstsq: k = c * y_mean / (c^2 + 1), b = y_mean / (c^2 + 1), где c - значение x ряда.
+        :returns: массивы k и b по одному значению на ряд
+        """
+        x, y, offsets, counts = Regression._series_layout(x, y, offsets)
+        x_mean = Regression._series_sums(x, offsets) / counts
+        y_mean = Regression._series_sums(y, offsets) / counts
+        if offsets is None:
+            dx, dy = x - x_mean[:, np.newaxis], y - y_mean[:, np.newaxis]
+        else:
+            dx, dy = x - np.repeat(x_mean, counts), y - np.repeat(y_mean, counts)
+        dx_dx = Regression._series_sums(dx * dx, offsets)
+        # при одинаковых x среднее может отличаться от них на ошибку округления, поэтому вырожденность
+        # определяется по количеству различных x, а не по dx_dx == 0
+        degenerate = Regression._series_distinct_counts(x, offsets) < 2
+        dx_dx[degenerate] = 1.0
+        k = Regression._series_sums(dx * dy, offsets) / dx_dx
+        b = y_mean - k * x_mean
+        if degenerate.any():
+            c = (x[:, 0] if offsets is None else x[offsets[:-1]])[degenerate]
+            b[degenerate] = y_mean[degenerate] / (c * c + 1.0)
+            k[degenerate] = c * b[degenerate]
+        return k, b
 
-        return x3
+    @staticmethod
+    def batch_poly_regression(x: np.ndarray, y: np.ndarray, order: int = 5,
+                              offsets: Union[np.ndarray, None] = None, method: str = "cholesky") -> np.ndarray:
+        """
+        Полиномиальная регрессия y = Σx^j*bj сразу для множества независимых рядов.
+        Матрица нормальных уравнений полинома - ганкелева: A_ij = Σxi^(i + j), поэтому для каждого ряда
+        достаточно сумм степеней Σx^p, p in [0, 2 * order - 2] и Σy*x^j, j in [0, order - 1].
+        Суммы считаются одной редукцией по всем рядам, затем системы решаются пачкой.
+        Ряды, в которых различных x меньше order (вырожденные системы), определяются заранее
+        и решаются отдельно методом "lstsq", чтобы не замедлять решение остальных систем.
+        :param x: значения по x: матрица (series, points) или все ряды подряд (если задан offsets)
+        :param y: значения по y той же формы
+        :param order: порядок полинома
+        :param offsets: границы рядов [0, ..., x.size] для рядов разной длины
+        :param method: метод решения систем: "cholesky", "qr" или "lstsq" (см. regressions.solvers)
+        :returns: матрица коэффициентов (series, order)
+        """
+        x, y, offsets, counts = Regression._series_layout(x, y, offsets)
+        powers = np.vander(x.ravel(), 2 * order - 1, increasing=True).reshape(x.shape + (2 * order - 1,))
+        power_sums = Regression._series_sums(powers, offsets)
+        degrees = np.arange(order)
+        gram = power_sums[:, degrees[:, np.newaxis] + degrees[np.newaxis, :]]
+        rhs = Regression._series_sums(powers[..., :order] * y[..., np.newaxis], offsets)
+        degenerate = Regression._series_distinct_counts(x, offsets) < order
+        if not degenerate.any():
+            return solve_normal_equations(gram, rhs, method)
+        result = np.empty(rhs.shape, dtype=float)
+        result[~degenerate] = solve_normal_equations(gram[~degenerate], rhs[~degenerate], method)
+        result[degenerate] = solve_normal_equations(gram[degenerate], rhs[degenerate], "lstsq")
+        return result
 
     @staticmethod
-    def polynom(x: np.ndarray, b: np.ndarray) -> np.ndarray:
+    def _horner(x: np.ndarray, b: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """
+        Схема Горнера y = b_0 + x * (b_1 + x * (b_2 + ...)) на месте в out.
+        b размера (..., order), out размера b.shape[:-1] + x.shape
         """
+        coefficients = b.reshape(b.shape[:-1] + (1,) * x.ndim + b.shape[-1:])
+        out[...] = coefficients[..., -1]
+        for j in range(b.shape[-1] - 2, -1, -1):
+            out *= x
+            out += coefficients[..., j]
+        return out
+
+    @staticmethod
+    def polynom(x: np.ndarray, b: np.ndarray, out: Union[np.ndarray, None] = None,
+                chunk_size: Union[int, None] = None) -> np.ndarray:
+        """
+        Вычисление полинома по схеме Горнера: одно умножение и одно сложение на месте на коэффициент,
+        без временных массивов.
         :param x: массив значений по x\n
-        :param b: массив коэффициентов полинома\n
+        :param b: массив коэффициентов полинома или матрица (n_sets, order) из нескольких наборов коэффициентов,
+                  которые вычисляются для одного и того же x за один вызов\n
+        :param out: необязательный массив для результата размера b.shape[:-1] + x.shape
+                    (например, np.memmap для данных, не помещающихся в память)\n
+        :param chunk_size: если задан, x обрабатывается блоками по chunk_size элементов вдоль первой оси\n
         :returns: возвращает полином yi = Σxi^j*bj\n
         """
-        x_curr = np.ones_like(x)
-        result = np.zeros_like(x)
-        for p, c in enumerate(b.flat):
-            result += x_curr * c
-            x_curr *= x
-        return result
+        x = np.asarray(x)
+        b = np.asarray(b)
+        if b.ndim not in (1, 2):
+            raise ValueError(f"polynom :: expected coefficients to have shape (order,) or (n_sets, order), "
+                             f"but got {b.shape}")
+        shape = b.shape[:-1] + x.shape
+        if out is None:
+            out = np.empty(shape, dtype=np.result_type(x.dtype, b.dtype, float))
+        elif out.shape != shape:
+            raise ValueError(f"polynom :: expected out to have shape {shape}, but got {out.shape}")
+        if b.shape[-1] == 0:
+            out.fill(0)
+            return out
+        if chunk_size is None or x.ndim == 0 or x.shape[0] <= chunk_size:
+            return Regression._horner(x, b, out)
+        lead = (slice(None),) * (b.ndim - 1)
+        for start in range(0, x.shape[0], chunk_size):
+            chunk = slice(start, start + chunk_size)
+            Regression._horner(x[chunk], b, out[lead + (chunk,)])
+        return out
 
     @staticmethod
-    def quadratic_regression_2d(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    def quadratic_regression_2d(x: np.ndarray, y: np.ndarray, z: np.ndarray, method: str = "cholesky") -> np.ndarray:
         """
         Генерирует набор коэффициентов поверхности второго порядка. Уравнение поверхности:
         z(x,y) = a * x^2 + x * y * b + c * y^2 + d * x + e * y + f
@@ -370,20 +634,42 @@ class Regression:
         :param x:
         :param y:
         :param z:
+        :param method: метод решения системы: "cholesky", "qr" или "lstsq" (см. regressions.solvers)
         :return:
         """
 
-        n = x.size
-
-        B = np.array([np.sum(x * x * z), np.sum(x * y * z), np.sum(y * y * z), np.sum(x * z), np.sum(y * z), np.sum(z)])
-
-        D = np.array([np.array([x[i] * x[i], x[i] * y[i], y[i] * y[i], x[i], y[i], 1]) for i in range(0, n)])
-
-        A = np.array([np.array([np.sum(D[:, i] * D[:, j]) for j in range(0, 6)]) for i in range(0, 6)])
+        return Regression.poly_surface_regression(np.column_stack((x, y)), z, 2, method)
 
-        Ainv = np.linalg.inv(A)
+    @staticmethod
+    def poly_surface_regression(args: np.ndarray, values: np.ndarray, order: int = 2,
+                                method: str = "cholesky") -> np.ndarray:
+        """
+        Регрессия полиномиальной поверхностью порядка order от n аргументов:
+        f(x_0,..., x_n) = Σ c_j * x_0^p_0j *...* x_n^p_nj, p_0j +...+ p_nj <= order
+        Порядок коэффициентов - как у regressions.design_matrix.polynomial_powers
+        (по убыванию степени: для n = 2, order = 2 это {x^2, x*y, y^2, x, y, 1}).
+        Для метода "cholesky" матрица A = D^T D считается блоками без построения полной матрицы D,
+        для "qr" и "lstsq" раскладывается сама матрица D.
+        :param args: аргументы точек (N, n_args) или (N,)
+        :param values: значения функции в точках (N,)
+        :param order: порядок поверхности
+        :param method: метод решения: "cholesky", "qr" или "lstsq" (см. regressions.solvers)
+        :return: коэффициенты поверхности
+        """
+        if method == "cholesky":
+            return solve_normal_equations(*polynomial_normal_equations(args, values, order), method)
+        return least_squares(polynomial_design_matrix(args, order), values, method)
 
-        return np.dot(Ainv, B)
+    @staticmethod
+    def poly_surface(args: np.ndarray, coefficients: np.ndarray, order: int = 2) -> np.ndarray:
+        """
+        Значения полиномиальной поверхности с коэффициентами poly_surface_regression
+        :param args: аргументы точек (N, n_args) или (N,)
+        :param coefficients: коэффициенты поверхности
+        :param order: порядок поверхности
+        :return: значения поверхности в точках (N,)
+        """
+        return polynomial_design_matrix(args, order) @ coefficients
 
     @staticmethod
     def distance_field_example():
@@ -395,6 +681,7 @@ class Regression:
         4) Проанализировать результат (смысл этой картинки в чём...)\n
         :return:
         """
+        import matplotlib.pyplot as plt
         print("distance field test:")
         x, y = Regression.test_data_along_line()
         k_, b_ = Regression.linear_regression(x, y)
@@ -420,6 +707,7 @@ class Regression:
            регрессионную прямую вида: y = k*x + b\n
         :return:
         """
+        import matplotlib.pyplot as plt
 
         x, y = Regression.test_data_along_line()
         k, b = Regression.linear_regression(x, y)
@@ -446,6 +734,7 @@ class Regression:
            регрессионную плоскость вида:\n z = kx*x + ky*y + b\n
         :return:
         """
+        import matplotlib.pyplot as plt
 
         x, y, z = Regression.test_data_2d()
         kx, ky, b = Regression.bi_linear_regression(x, y, z)
@@ -478,6 +767,7 @@ class Regression:
            регрессионную кривую. Для построения кривой использовать метод polynom\n
         :return:
         """
+        import matplotlib.pyplot as plt
         print('\npoly regression test:')
         x, y = Regression.test_data_along_cosh()
         coefficients = Regression.poly_regression(x, y)
@@ -522,6 +812,7 @@ class Regression:
 
     @staticmethod
     def quadratic_reg_example():
+        import matplotlib.pyplot as plt
 
         print('2d quadratic regression test:')
         x, y, z = Regression.second_order_surface_2d()
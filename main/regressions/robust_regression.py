@@ -0,0 +1,212 @@
+from typing import Any, Callable, Dict, Tuple, Union
+from contextlib import nullcontext
+from types import SimpleNamespace
+import numpy as np
+from regressions.solvers import least_squares
+from regressions.design_matrix import polynomial_design_matrix
+from regressions.regression import RandomSource
+
+"""
+Устойчивые к выбросам варианты линейной (y = k * x + b) и n-линейной (f = k_0 * x_0 +...+ k_n * x_n + b) регрессии.
+Коэффициенты возвращаются в том же порядке, что и у Regression.n_linear_regression: [k_0,..., k_n, b].
+
+1. IRLS (iteratively reweighted least squares): на каждом шаге решается взвешенная задача
+   Σ wi * (yi - (Xi, C))^2 -> min, где веса wi = w(ei / s) зависят от нормированной невязки.
+   s - робастная оценка разброса невязок: s = median(|e - median(e)|) / 0.6745.
+   Huber: w(u) = min(1, c / |u|)
+   Tukey: w(u) = (1 - (u / c)^2)^2 при |u| < c, иначе 0
+2. RANSAC: по случайным минимальным подвыборкам строятся модели-кандидаты, выбирается модель с
+   наибольшим количеством точек, невязка которых не превышает порог, и уточняется по этим точкам.
+   Кандидаты считаются пачками, количество испытаний сокращается по мере роста доли "хороших" точек:
+   trials = log(1 - confidence) / log(1 - inliers_ratio^n_samples)
+"""
+
+WeightsFunction = Callable[[np.ndarray], np.ndarray]
+
+_MAD_NORMALIZATION = 0.6745
+
+
+def huber_weights(u: np.ndarray, c: float = 1.345) -> np.ndarray:
+    """
+    Веса Хьюбера
+    :param u: нормированные невязки
+    :param c: порог, после которого вклад невязки растёт линейно, а не квадратично
+    :return: веса
+    """
+    abs_u = np.abs(u)
+    return np.minimum(1.0, c / np.maximum(abs_u, np.finfo(float).tiny))
+
+
+def tukey_weights(u: np.ndarray, c: float = 4.685) -> np.ndarray:
+    """
+    Веса Тьюки (biweight)
+    :param u: нормированные невязки
+    :param c: порог, после которого точка полностью исключается
+    :return: веса
+    """
+    t = u / c
+    t *= t
+    np.subtract(1.0, t, out=t)
+    np.maximum(t, 0.0, out=t)
+    return t * t
+
+
+ROBUST_WEIGHTS: Dict[str, WeightsFunction] = {
+    "huber": huber_weights,
+    "tukey": tukey_weights,
+}
+
+
+def _mad_scale(values: np.ndarray) -> float:
+    """
+    Робастная оценка среднеквадратичного отклонения: median(|v - median(v)|) / 0.6745
+    """
+    return float(np.median(np.abs(values - np.median(values)))) / _MAD_NORMALIZATION
+
+
+def irls_regression(args: np.ndarray, values: np.ndarray, loss: Union[str, WeightsFunction] = "huber",
+                    max_iters: int = 50, accuracy: float = 1e-8, method: str = "cholesky") -> np.ndarray:
+    """
+    Линейная (args (N,)) или n-линейная (args (N, n)) регрессия методом IRLS.
+    :param args: аргументы точек (N,) или (N, n)
+    :param values: значения функции (N,)
+    :param loss: "huber", "tukey" или функция весов от нормированных невязок
+    :param max_iters: максимальное количество итераций
+    :param accuracy: относительное изменение коэффициентов, при котором итерации прекращаются
+    :param method: метод решения: "cholesky", "qr" или "lstsq" (см. regressions.solvers)
+    :return: коэффициенты [k_0,..., k_n, b]
+    """
+    weights_function = ROBUST_WEIGHTS[loss] if isinstance(loss, str) else loss
+    design = polynomial_design_matrix(args, 1)
+    values = np.asarray(values, dtype=float)
+    coefficients = least_squares(design, values, method)
+    for _ in range(max_iters):
+        residuals = values - design @ coefficients
+        scale = _mad_scale(residuals)
+        if scale <= np.finfo(float).eps:
+            break
+        sqrt_weights = np.sqrt(weights_function(residuals / scale))
+        updated = least_squares(design * sqrt_weights[:, np.newaxis], values * sqrt_weights, method)
+        converged = np.linalg.norm(updated - coefficients) <= accuracy * (1.0 + np.linalg.norm(coefficients))
+        coefficients = updated
+        if converged:
+            break
+    return coefficients
+
+
+def _required_trials(inliers_ratio: float, n_samples: int, confidence: float, max_trials: int) -> int:
+    """
+    Количество испытаний RANSAC, после которого с вероятностью confidence хотя бы одна подвыборка
+    состояла только из "хороших" точек
+    """
+    if inliers_ratio >= 1.0:
+        return 0
+    good_sample = inliers_ratio ** n_samples
+    if good_sample <= 0.0:
+        return max_trials
+    if good_sample >= 1.0:
+        return 0
+    return min(max_trials, int(np.ceil(np.log(1.0 - confidence) / np.log1p(-good_sample))))
+
+
+def _count_inliers(design: np.ndarray, values: np.ndarray, candidates: np.ndarray, threshold: float,
+                   chunk_size: int = 1 << 22) -> np.ndarray:
+    """
+    Количество точек с |yi - (Xi, C)| <= threshold для каждого кандидата C.
+    Точки обрабатываются блоками так, чтобы матрица невязок содержала не более chunk_size элементов.
+    """
+    counts = np.zeros(candidates.shape[0], dtype=np.int64)
+    n_chunk = max(1, chunk_size // candidates.shape[0])
+    for start in range(0, values.size, n_chunk):
+        residuals = design[start: start + n_chunk] @ candidates.T
+        residuals -= values[start: start + n_chunk, np.newaxis]
+        counts += (np.abs(residuals) <= threshold).sum(axis=0)
+    return counts
+
+
+def _ransac_trials(design: np.ndarray, values: np.ndarray, threshold: float, max_trials: int,
+                   confidence: float, batch_size: int, seed: int,
+                   shared: Union[Tuple[Any, Any, Any], None] = None) -> Tuple[int, Union[np.ndarray, None], int]:
+    """
+    Серия испытаний RANSAC (выполняется в текущем процессе или в процессе из пула).
+    :param shared: (lock, trials, best_count) - общие для процессов пула блокировка, количество испытаний
+                   и лучшее количество "хороших" точек (multiprocessing Manager Lock и Value) или None.
+                   Испытания заказываются из общего счётчика, а нужное для confidence количество
+                   считается по лучшей модели всех процессов, так что пул останавливается, как только
+                   суммарное количество испытаний его достигнет.
+    :return: количество "хороших" точек лучшей модели процесса, её коэффициенты и количество испытаний процесса
+    """
+    lock, total, shared_best = shared if shared is not None else \
+        (nullcontext(), SimpleNamespace(value=0), SimpleNamespace(value=0))
+    rng = np.random.default_rng(seed)
+    n_points, n_samples = design.shape
+    best_count, best, trials = 0, None, 0
+    while True:
+        with lock:
+            required = _required_trials(shared_best.value / n_points, n_samples, confidence, max_trials)
+            batch = min(batch_size, required - total.value)
+            if batch <= 0:
+                break
+            total.value += batch
+        samples = np.stack([rng.choice(n_points, n_samples, replace=False) for _ in range(batch)])
+        candidates = least_squares(design[samples], values[samples], "cholesky")
+        finite = np.isfinite(candidates).all(axis=1)
+        trials += batch
+        if not finite.any():
+            continue
+        candidates = candidates[finite]
+        counts = _count_inliers(design, values, candidates, threshold)
+        index = int(counts.argmax())
+        if counts[index] > best_count:
+            best_count, best = int(counts[index]), candidates[index]
+            with lock:
+                shared_best.value = max(shared_best.value, best_count)
+    return best_count, best, trials
+
+
+def ransac_regression(args: np.ndarray, values: np.ndarray, threshold: Union[float, None] = None,
+                      max_trials: int = 1000, confidence: float = 0.99, batch_size: int = 64,
+                      n_processes: int = 1, rng: RandomSource = None,
+                      method: str = "cholesky") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Линейная (args (N,)) или n-линейная (args (N, n)) регрессия методом RANSAC.
+    :param args: аргументы точек (N,) или (N, n)
+    :param values: значения функции (N,)
+    :param threshold: максимальная невязка "хорошей" точки, по умолчанию 2.5 * робастного разброса
+                      невязок обычной регрессии
+    :param max_trials: максимальное количество испытаний (суммарно на все процессы)
+    :param confidence: вероятность найти подвыборку без выбросов, по которой сокращается число испытаний
+    :param batch_size: количество кандидатов, которые строятся и проверяются за один векторный шаг
+    :param n_processes: количество процессов, между которыми делятся испытания
+    :param rng: генератор случайных чисел, seed или None
+    :param method: метод решения итоговой задачи по "хорошим" точкам (см. regressions.solvers)
+    :return: коэффициенты [k_0,..., k_n, b] и маска "хороших" точек
+    """
+    design = polynomial_design_matrix(args, 1)
+    values = np.asarray(values, dtype=float)
+    if values.size != design.shape[0] or values.size < design.shape[1]:
+        raise ValueError(f"ransac_regression :: expected at least {design.shape[1]} points and values to have "
+                         f"shape ({design.shape[0]},), but got {values.shape}")
+    if threshold is None:
+        threshold = 2.5 * _mad_scale(values - design @ least_squares(design, values, method))
+    rng = np.random.default_rng(rng)
+    n_processes = max(1, min(n_processes, max_trials))
+    seeds = rng.integers(0, 2 ** 63 - 1, n_processes)
+
+    if n_processes == 1:
+        results = [_ransac_trials(design, values, threshold, max_trials, confidence, batch_size, int(seeds[0]))]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import Manager
+        # счётчик испытаний и лучшая модель общие: пул останавливается по суммарному количеству испытаний
+        with Manager() as manager, ProcessPoolExecutor(max_workers=n_processes) as executor:
+            shared = (manager.Lock(), manager.Value('q', 0), manager.Value('q', 0))
+            futures = [executor.submit(_ransac_trials, design, values, threshold, max_trials, confidence,
+                                       batch_size, int(seed), shared) for seed in seeds]
+            results = [future.result() for future in futures]
+
+    best_count, best, _ = max(results, key=lambda result: result[0])
+    if best is None:
+        raise RuntimeError("ransac_regression :: unable to find a valid model")
+    inliers = np.abs(design @ best - values) <= threshold
+    return least_squares(design[inliers], values[inliers], method), inliers
@@ -0,0 +1,145 @@
+from typing import Tuple
+import numpy as np
+
+"""
+Общие решатели задачи наименьших квадратов для регрессий.
+Обратные матрицы явно не вычисляются. Поддерживаются методы:
+    "cholesky" - разложение Холецкого матрицы нормальных уравнений X^T X (самый быстрый,
+                 матрицы, для которых разложение не существует, решаются через "lstsq" по отдельности);
+    "qr"       - QR разложение (для least_squares - разложение самой матрицы признаков X,
+                 что не возводит в квадрат число обусловленности);
+    "lstsq"    - решение через SVD (np.linalg.lstsq), устойчиво к вырожденным системам.
+Все функции работают с пачками независимых задач: ведущие измерения массивов - номера задач,
+а правая часть может содержать несколько столбцов (например, тысячи рядов с одной матрицей признаков).
+"""
+
+SOLVER_METHODS = ("cholesky", "qr", "lstsq")
+
+
+def _check_method(method: str) -> None:
+    if method not in SOLVER_METHODS:
+        raise ValueError(f"Unknown solver method \"{method}\", expected one of: {', '.join(SOLVER_METHODS)}")
+
+
+def _as_columns(matrix: np.ndarray, rhs: np.ndarray) -> Tuple[np.ndarray, bool]:
+    """
+    Приводит правую часть к виду (..., M, K).
+    :return: правая часть и признак того, что исходно она была вектором (..., M)
+    """
+    if rhs.ndim == matrix.ndim - 1:
+        return rhs[..., np.newaxis], True
+    return rhs, False
+
+
+def _transpose(matrix: np.ndarray) -> np.ndarray:
+    return np.swapaxes(matrix, -1, -2)
+
+
+def _lstsq(matrix: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """
+    np.linalg.lstsq для пачки задач (..., M, F), (..., M, K)
+    """
+    if matrix.ndim == 2:
+        return np.linalg.lstsq(matrix, rhs, rcond=None)[0]
+    batch_shape = np.broadcast_shapes(matrix.shape[:-2], rhs.shape[:-2])
+    matrix = np.broadcast_to(matrix, batch_shape + matrix.shape[-2:])
+    rhs = np.broadcast_to(rhs, batch_shape + rhs.shape[-2:])
+    result = np.empty(batch_shape + (matrix.shape[-1], rhs.shape[-1]), dtype=float)
+    for index in np.ndindex(*batch_shape):
+        result[index] = np.linalg.lstsq(matrix[index], rhs[index], rcond=None)[0]
+    return result
+
+
+def _qr_solve(matrix: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """
+    Решение в смысле наименьших квадратов через QR разложение: R C = Q^T rhs
+    """
+    q, r = np.linalg.qr(matrix)
+    return np.linalg.solve(r, _transpose(q) @ rhs)
+
+
+def _positive_definite(gram: np.ndarray) -> np.ndarray:
+    """
+    Признак существования разложения Холецкого для каждой матрицы пачки (..., F, F).
+    np.linalg.cholesky для пачки сообщает только о том, что не разложилась хотя бы одна матрица,
+    поэтому не разложившаяся часть пачки делится пополам, пока не останутся отдельные матрицы:
+    при k вырожденных матрицах из n это O(k log n) пакетных разложений вместо n одиночных.
+    """
+    matrices = gram.reshape((-1,) + gram.shape[-2:])
+    result = np.ones(matrices.shape[0], dtype=bool)
+    parts = [(0, matrices.shape[0])]
+    while parts:
+        start, stop = parts.pop()
+        try:
+            np.linalg.cholesky(matrices[start: stop])
+        except np.linalg.LinAlgError:
+            if stop - start == 1:
+                result[start] = False
+            else:
+                middle = (start + stop) // 2
+                parts += [(start, middle), (middle, stop)]
+    return result.reshape(gram.shape[:-2])
+
+
+def _cholesky_solve(gram: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """
+    Решение систем с симметричными матрицами (..., F, F). Разложение Холецкого проверяет положительную
+    определённость, сама система решается одним np.linalg.solve: в numpy нет пакетного решения
+    треугольных систем, а два общих решения вместо одного втрое медленнее.
+    Матрицы без разложения (вырожденные) решаются через _lstsq по отдельности, остальные - пачкой.
+    """
+    try:
+        np.linalg.cholesky(gram)
+        return np.linalg.solve(gram, rhs)
+    except np.linalg.LinAlgError:
+        if gram.ndim == 2:
+            return _lstsq(gram, rhs)
+    batch_shape = np.broadcast_shapes(gram.shape[:-2], rhs.shape[:-2])
+    gram = np.broadcast_to(gram, batch_shape + gram.shape[-2:])
+    rhs = np.broadcast_to(rhs, batch_shape + rhs.shape[-2:])
+    regular = _positive_definite(gram)
+    result = np.empty(batch_shape + (gram.shape[-1], rhs.shape[-1]), dtype=float)
+    result[regular] = np.linalg.solve(gram[regular], rhs[regular])
+    result[~regular] = _lstsq(gram[~regular], rhs[~regular])
+    return result
+
+
+def solve_normal_equations(gram: np.ndarray, rhs: np.ndarray, method: str = "cholesky") -> np.ndarray:
+    """
+    Решает систему нормальных уравнений (X^T X) C = X^T y без вычисления обратной матрицы.
+    :param gram: матрица X^T X размера (..., F, F)
+    :param rhs: правая часть X^T y размера (..., F) или (..., F, K)
+    :param method: "cholesky", "qr" или "lstsq"
+    :return: коэффициенты C того же размера, что и rhs
+    """
+    _check_method(method)
+    gram = np.asarray(gram, dtype=float)
+    rhs, is_vector = _as_columns(gram, np.asarray(rhs, dtype=float))
+    if method == "cholesky":
+        result = _cholesky_solve(gram, rhs)
+    elif method == "qr":
+        result = _qr_solve(gram, rhs)
+    else:
+        result = _lstsq(gram, rhs)
+    return result[..., 0] if is_vector else result
+
+
+def least_squares(design: np.ndarray, targets: np.ndarray, method: str = "cholesky") -> np.ndarray:
+    """
+    Решает задачу Σ(yi - (Xi, C))^2 -> min по матрице признаков X.
+    :param design: матрица признаков X размера (..., N, F)
+    :param targets: значения y размера (..., N) или (..., N, K)
+    :param method: "cholesky" (через нормальные уравнения), "qr" или "lstsq" (по самой матрице X)
+    :return: коэффициенты C размера (..., F) или (..., F, K)
+    """
+    _check_method(method)
+    design = np.asarray(design, dtype=float)
+    targets, is_vector = _as_columns(design, np.asarray(targets, dtype=float))
+    if method == "cholesky":
+        design_t = _transpose(design)
+        result = solve_normal_equations(design_t @ design, design_t @ targets, method)
+    elif method == "qr":
+        result = _qr_solve(design, targets)
+    else:
+        result = _lstsq(design, targets)
+    return result[..., 0] if is_vector else result
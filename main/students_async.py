@@ -0,0 +1,81 @@
+from typing import AsyncIterator, Dict, Iterable, List, Sequence, Tuple
+from collections import namedtuple
+import asyncio
+import os.path
+import time
+from students_reader import Student, LoadReport, intern_names, load_students_csv, load_students_json, \
+    merge_students
+
+"""
+Асинхронная загрузка студентов из множества csv/json-файлов (например, выгрузок по группам с сетевого диска).
+Файлы читаются и разбираются в пуле потоков (или процессов) ограниченного размера, результаты
+отдаются по мере готовности файлов вместе со временем загрузки каждого файла.
+Пример:
+    async for result in load_students_many(paths, concurrency=8):
+        print(result.path, len(result.students), result.seconds)
+    students, results = asyncio.run(load_students_merged(paths, concurrency=8))
+"""
+
+FileLoadResult = namedtuple('FileLoadResult', 'path, students, report, seconds, error')
+
+STUDENTS_LOADERS = {
+    ".csv": load_students_csv,
+    ".json": load_students_json,
+}
+
+
+def _load_file(path: str) -> FileLoadResult:
+    """
+    Загрузка одного файла (выполняется в потоке или процессе пула). Ошибка чтения файла целиком
+    не выбрасывается, а возвращается в поле error, ошибки отдельных записей собираются в report.
+    """
+    start = time.perf_counter()
+    report = LoadReport()
+    try:
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in STUDENTS_LOADERS:
+            raise ValueError(f"load_students_many:: unknown file type \"{extension}\", "
+                             f"expected one of: {', '.join(STUDENTS_LOADERS)}")
+        students = STUDENTS_LOADERS[extension](path, report)
+        if students is None:
+            raise FileNotFoundError(f"load_students_many:: file \"{path}\" not found")
+        return FileLoadResult(path, students, report, time.perf_counter() - start, None)
+    except Exception as ex:
+        return FileLoadResult(path, [], report, time.perf_counter() - start, ex)
+
+
+async def load_students_many(paths: Iterable[str], concurrency: int = 4,
+                             use_processes: bool = False) -> AsyncIterator[FileLoadResult]:
+    """
+    Загрузка студентов из файлов paths, результаты отдаются в порядке завершения загрузки файлов.
+    :param concurrency: количество одновременно загружаемых файлов (размер пула)
+    :param use_processes: разбирать файлы в пуле процессов (для больших файлов, где разбор дороже чтения)
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    loop = asyncio.get_running_loop()
+    executor = ProcessPoolExecutor(max_workers=concurrency) if use_processes else \
+        ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        futures = [loop.run_in_executor(executor, _load_file, path) for path in paths]
+        for future in asyncio.as_completed(futures):
+            result = await future
+            if use_processes:
+                intern_names(result.students)
+            yield result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def load_students_merged(paths: Sequence[str], concurrency: int = 4,
+                               use_processes: bool = False) -> Tuple[List[Student], List[FileLoadResult]]:
+    """
+    Загрузка студентов из файлов paths с объединением по unique_id.
+    Файлы загружаются одновременно, но объединяются в порядке paths, так что результат не зависит
+    от порядка завершения загрузки. Студенты в результатах загрузки файлов не изменяются.
+    :return: объединённый список студентов и результаты загрузки файлов (в порядке paths)
+    """
+    results: Dict[str, FileLoadResult] = {}
+    async for result in load_students_many(paths, concurrency, use_processes):
+        results[result.path] = result
+    ordered = [results[path] for path in paths]
+    return merge_students(result.students for result in ordered), ordered
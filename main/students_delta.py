@@ -0,0 +1,233 @@
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+import json
+import os.path
+from students_reader import Student, LabWorkSession, LoadReport, format_session_date, parse_session_date, \
+    start_report, finish_report
+from students_snapshot import StudentsSnapshot, load_students_snapshot, save_students_snapshot
+
+"""
+Журнал изменений (delta log) студентов поверх двоичного снимка (см. students_snapshot).
+Ежедневные изменения дописываются в конец текстового журнала по записи json на строку, а снимок
+переписывается только при сжатии (compact_students), так что стоимость обновления зависит от размера
+изменений, а не всей истории. Записи журнала:
+    {"op": "base", "checksum": ...}                   - контрольная сумма снимка, к которому относится журнал
+    {"op": "student", "unique_id": ..., "name": ..., "surname": ..., "group": ..., "subgroup": ...}
+                                                      - новый студент
+    {"op": "edit", "unique_id": ..., "name": ..., "surname": ...}
+                                                      - изменение имени и/или фамилии
+    {"op": "session", "unique_id": ..., "presence": ..., "lab_work_n": ..., "lab_work_mark": ..., "date": ...}
+                                                      - новое лабораторное занятие
+Первая запись журнала - "base". Если снимок был переписан при сжатии, а журнал не был очищен
+(например, процесс прервался), или снимок был перезаписан в обход журнала, контрольные суммы не совпадут:
+при чтении журнал пропускается с ошибкой в отчёте (занятия не применяются дважды), а дописывание
+в журнал с неприменёнными записями отклоняется (StaleDeltaLogError), пока он не будет очищен reset().
+Дата занятия без даты записывается как null.
+"""
+
+DELTA_OPS = ("base", "student", "edit", "session")
+
+
+class StaleDeltaLogError(ValueError):
+    """
+    Журнал с неприменёнными записями относится к другому снимку (контрольные суммы не совпадают)
+    """
+
+
+def _snapshot_checksum(snapshot: Union[StudentsSnapshot, None]) -> Union[int, None]:
+    return None if snapshot is None else snapshot.checksum
+
+
+class StudentsDeltaLog:
+    """
+    Дописываемый журнал изменений студентов для снимка snapshot_path
+    """
+    __slots__ = ('_log_path', '_snapshot_path')
+
+    def __init__(self, log_path: str, snapshot_path: str):
+        self._log_path = log_path
+        self._snapshot_path = snapshot_path
+
+    @property
+    def log_path(self) -> str:
+        return self._log_path
+
+    @property
+    def snapshot_path(self) -> str:
+        return self._snapshot_path
+
+    def _append(self, records: Iterable[dict]) -> None:
+        lines = [json.dumps(record, ensure_ascii=False) + '\n' for record in records]
+        if not lines:
+            return
+        checksum = _snapshot_checksum(load_students_snapshot(self._snapshot_path))
+        is_current = self._base() == {"op": "base", "checksum": checksum}
+        # журнал другого снимка начинается заново, только если в нём нет неприменённых записей
+        if not is_current and self.has_pending_records():
+            raise StaleDeltaLogError(f"students_delta:: log \"{self._log_path}\" belongs to another snapshot "
+                                     f"and has pending records, compact or reset() it first")
+        # последняя строка, оборванная при прерванной записи, не должна склеиться с новой записью
+        is_unterminated = is_current and not self._ends_with_newline()
+        with open(self._log_path, 'a' if is_current else 'w', encoding='utf-8') as log_file:
+            if not is_current:
+                log_file.write(json.dumps({"op": "base", "checksum": checksum}) + '\n')
+            elif is_unterminated:
+                log_file.write('\n')
+            log_file.writelines(lines)
+
+    def has_pending_records(self) -> bool:
+        """
+        Есть ли в журнале записи, кроме "base"
+        """
+        return any(record.get("op") != "base" for record in self.records())
+
+    def reset(self) -> None:
+        """
+        Удаление журнала вместе со всеми записями (например, после прерванного сжатия,
+        когда изменения журнала уже перенесены в снимок)
+        """
+        if os.path.exists(self._log_path):
+            os.remove(self._log_path)
+
+    def _ends_with_newline(self) -> bool:
+        """
+        Журнал пуст или его последняя строка завершена переводом строки
+        """
+        with open(self._log_path, 'rb') as log_file:
+            if log_file.seek(0, os.SEEK_END) == 0:
+                return True
+            log_file.seek(-1, os.SEEK_END)
+            return log_file.read(1) == b'\n'
+
+    def _base(self) -> Union[dict, None]:
+        """
+        Первая запись журнала (None, если журнала нет или он пуст)
+        """
+        return next(self.records(), None)
+
+    def append_student(self, student: Student) -> None:
+        """
+        Запись нового студента вместе с его занятиями
+        """
+        self._append([{"op": "student", "unique_id": student.unique_id, "name": student.name,
+                       "surname": student.surname, "group": student.group, "subgroup": student.subgroup}] +
+                     [_session_record(student.unique_id, session) for session in student.lab_work_sessions])
+
+    def append_sessions(self, unique_id: int, sessions: Iterable[LabWorkSession]) -> None:
+        """
+        Запись новых лабораторных занятий студента
+        """
+        self._append(_session_record(unique_id, session) for session in sessions)
+
+    def edit_student(self, unique_id: int, name: Union[str, None] = None, surname: Union[str, None] = None) -> None:
+        """
+        Запись изменения имени и/или фамилии студента (то же, что сеттеры Student.name и Student.surname)
+        """
+        record = {"op": "edit", "unique_id": unique_id}
+        if name is not None:
+            record["name"] = name
+        if surname is not None:
+            record["surname"] = surname
+        self._append([record])
+
+    def numbered_records(self, report: Union[LoadReport, None] = None) -> Iterator[Tuple[int, dict]]:
+        """
+        Записи журнала по порядку вместе с номерами строк (с 1), пустой журнал, если файла нет.
+        Строки, которые не разбираются как запись (например, последняя строка, оборванная
+        при прерванной записи), пропускаются и регистрируются в report.
+        """
+        if not os.path.exists(self._log_path):
+            return
+        with open(self._log_path, 'r', encoding='utf-8') as log_file:
+            for row, line in enumerate(log_file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError(f"students_delta:: record must be an object, got {type(record).__name__}")
+                except ValueError as ex:
+                    if report is not None:
+                        report.add(row, "record" if line.endswith('\n') else "unterminated record", ex)
+                    continue
+                yield row, record
+
+    def records(self, report: Union[LoadReport, None] = None) -> Iterator[dict]:
+        """
+        Записи журнала по порядку (пустой журнал, если файла нет), см. numbered_records
+        """
+        for _, record in self.numbered_records(report):
+            yield record
+
+
+def _session_record(unique_id: int, session: LabWorkSession) -> dict:
+    return {"op": "session", "unique_id": unique_id, "presence": 1 if session.presence else 0,
+            "lab_work_n": session.lab_work_number, "lab_work_mark": session.lab_work_mark,
+            "date": None if session.lab_work_date is None else format_session_date(session.lab_work_date)}
+
+
+def _apply_record(students: Dict[int, Student], record: dict) -> None:
+    op = record.get("op")
+    unique_id = record["unique_id"]
+    if op == "student":
+        if unique_id in students:
+            raise ValueError(f"students_delta:: student {unique_id} already exists")
+        students[unique_id] = Student(unique_id, record["name"], record["surname"], record["group"],
+                                      record["subgroup"])
+        return
+    if unique_id not in students:
+        raise KeyError(f"students_delta:: student {unique_id} not found")
+    student = students[unique_id]
+    if op == "edit":
+        if "name" in record:
+            student.name = record["name"]
+        if "surname" in record:
+            student.surname = record["surname"]
+    elif op == "session":
+        student.append_lab_work_session(LabWorkSession(record["presence"] == 1, int(record["lab_work_n"]),
+                                                       int(record["lab_work_mark"]),
+                                                       None if record["date"] is None else
+                                                       parse_session_date(record["date"])))
+    else:
+        raise ValueError(f"students_delta:: unknown op \"{op}\", expected one of: {', '.join(DELTA_OPS)}")
+
+
+def load_students_with_deltas(log: StudentsDeltaLog, report: Union[LoadReport, None] = None) -> List[Student]:
+    """
+    Студенты снимка с применёнными изменениями журнала.
+    Порядок: студенты снимка, затем новые студенты в порядке их записи в журнал.
+    Ошибочные записи журнала регистрируются в report (row - номер строки журнала, с 1) и пропускаются.
+    """
+    report, is_own_report = start_report(report)
+    snapshot = load_students_snapshot(log.snapshot_path)
+    students: Dict[int, Student] = {} if snapshot is None else {student.unique_id: student for student in snapshot}
+    checksum = _snapshot_checksum(snapshot)
+    for row, record in log.numbered_records(report):
+        if record.get("op") == "base":
+            if record.get("checksum") != checksum:
+                # журнал относится к другому снимку (например, уже сжатому вместе с ним)
+                report.add(row, "base", StaleDeltaLogError(
+                    f"students_delta:: log \"{log.log_path}\" belongs to snapshot with checksum "
+                    f"{record.get('checksum')}, not {checksum}, its records are skipped"))
+                break
+            continue
+        try:
+            _apply_record(students, record)
+        except Exception as ex:
+            report.add(row, record.get("op", "op"), ex)
+    finish_report(report, is_own_report)
+    return list(students.values())
+
+
+def compact_students(log: StudentsDeltaLog, report: Union[LoadReport, None] = None) -> List[Student]:
+    """
+    Сжатие: изменения журнала переносятся в новый снимок, журнал очищается.
+    Снимок записывается во временный файл и атомарно заменяет старый.
+    :return: студенты нового снимка
+    """
+    students = load_students_with_deltas(log, report)
+    temp_path = log.snapshot_path + '.tmp'
+    save_students_snapshot(temp_path, students)
+    os.replace(temp_path, log.snapshot_path)
+    if os.path.exists(log.log_path):
+        os.remove(log.log_path)
+    return students
@@ -0,0 +1,196 @@
+from typing import Dict, Iterable, List, Tuple, Union
+from datetime import date
+import numpy as np
+from students_reader import Student
+from students_table import StudentTable, NO_DATE, date_to_days
+
+"""
+Индексы для запросов к загруженным студентам.
+Индекс строится один раз по StudentTable (или по списку Student) и содержит:
+    хэш-индексы: unique_id -> строка студента, (group, subgroup) и group -> строки студентов;
+    сортированные индексы занятий по дате и по номеру лабораторной работы.
+Запросы возвращают наборы строк - отсортированные массивы номеров строк таблицы занятий (или студентов),
+которые можно пересекать (np.intersect1d) и передавать в агрегирующие методы.
+Пример: средняя оценка по группам за третью лабораторную работу
+    index = StudentIndex.from_students(load_students_csv(path))
+    index.mean_marks_by_group(index.query(lab_work_number=3))
+"""
+
+RowSet = np.ndarray
+
+_EMPTY_ROWS = np.empty(0, dtype=np.int64)
+
+
+def _sorted_index(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Сортированный индекс: перестановка строк по возрастанию ключа и ключи в этом порядке
+    """
+    order = np.argsort(keys, kind='stable')
+    return order, keys[order]
+
+
+def _range_rows(order: np.ndarray, keys: np.ndarray, low: Union[int, None], high: Union[int, None]) -> RowSet:
+    """
+    Строки с low <= key <= high (None - граница не задана) по сортированному индексу
+    """
+    start = 0 if low is None else np.searchsorted(keys, low, side='left')
+    stop = keys.size if high is None else np.searchsorted(keys, high, side='right')
+    return np.sort(order[start:stop])
+
+
+def _group_rows(keys: np.ndarray) -> Dict[Union[int, Tuple[int, ...]], RowSet]:
+    """
+    Хэш-индекс: значение ключа -> отсортированные строки с этим ключом
+    """
+    if keys.size == 0:
+        return {}
+    unique, inverse = np.unique(keys, return_inverse=True, axis=0 if keys.ndim > 1 else None)
+    inverse = inverse.ravel()
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(unique.shape[0] + 1))
+    result = {}
+    for index, value in enumerate(unique.tolist()):
+        result[tuple(value) if isinstance(value, list) else value] = order[bounds[index]: bounds[index + 1]]
+    return result
+
+
+class StudentIndex:
+    __slots__ = ('_table', '_by_id', '_by_group', '_by_subgroup', '_date_order', '_dates', '_number_order',
+                 '_numbers', '_owners')
+
+    def __init__(self, table: StudentTable):
+        """
+            param: table: колоночное хранилище студентов
+        """
+        students, sessions = table.students, table.sessions
+        self._table = table
+        self._by_id: Dict[int, int] = {unique_id: row for row, unique_id in enumerate(students['unique_id'].tolist())}
+        self._by_group = _group_rows(students['group'])
+        self._by_subgroup = _group_rows(np.column_stack((students['group'], students['subgroup'])))
+        self._date_order, self._dates = _sorted_index(sessions['date'])
+        self._number_order, self._numbers = _sorted_index(sessions['lab_work_number'])
+        self._owners = sessions['student']
+
+    @staticmethod
+    def from_students(students: Iterable[Student]) -> 'StudentIndex':
+        """
+        Построение индекса по объектам Student
+        """
+        return StudentIndex(StudentTable.from_students(students))
+
+    @property
+    def table(self) -> StudentTable:
+        """
+        Метод доступа для проиндексированной таблицы
+        """
+        return self._table
+
+    def student_row(self, unique_id: int) -> int:
+        """
+        Строка студента с заданным unique_id или -1
+        """
+        return self._by_id.get(unique_id, -1)
+
+    def student_rows(self, group: Union[int, None] = None, subgroup: Union[int, None] = None) -> RowSet:
+        """
+        Строки студентов группы (и подгруппы, если задана). Без условий - все студенты.
+        """
+        if group is None:
+            if subgroup is not None:
+                raise ValueError("StudentIndex :: subgroup requires group")
+            return np.arange(len(self._table), dtype=np.int64)
+        rows = self._by_group.get(group) if subgroup is None else self._by_subgroup.get((group, subgroup))
+        return _EMPTY_ROWS if rows is None else rows
+
+    def sessions_of(self, student_rows: RowSet) -> RowSet:
+        """
+        Строки занятий заданных студентов (занятия студента лежат подряд, поэтому строки берутся диапазонами)
+        """
+        student_rows = np.asarray(student_rows, dtype=np.int64)
+        offsets = self._table.offsets
+        starts, counts = offsets[student_rows], offsets[student_rows + 1] - offsets[student_rows]
+        total = int(counts.sum())
+        if total == 0:
+            return _EMPTY_ROWS
+        # номер строки = начало диапазона своего студента + позиция внутри диапазона
+        shifts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return np.sort(np.arange(total, dtype=np.int64) + shifts)
+
+    def sessions_between(self, date_from: Union[date, None] = None, date_to: Union[date, None] = None) -> RowSet:
+        """
+        Строки занятий с датой в диапазоне [date_from, date_to] (None - граница не задана).
+        Занятия без даты (NO_DATE) не попадают ни в один диапазон.
+        """
+        return _range_rows(self._date_order, self._dates, NO_DATE + 1 if date_from is None else date_to_days(date_from),
+                           None if date_to is None else date_to_days(date_to))
+
+    def sessions_of_lab(self, lab_work_number: int, last_number: Union[int, None] = None) -> RowSet:
+        """
+        Строки занятий лабораторной работы lab_work_number (или работ с номерами от lab_work_number до last_number)
+        """
+        return _range_rows(self._number_order, self._numbers, lab_work_number,
+                           lab_work_number if last_number is None else last_number)
+
+    def query(self, unique_id: Union[int, None] = None, group: Union[int, None] = None,
+              subgroup: Union[int, None] = None, lab_work_number: Union[int, None] = None,
+              date_from: Union[date, None] = None, date_to: Union[date, None] = None,
+              presence: Union[bool, None] = None) -> RowSet:
+        """
+        Строки занятий, удовлетворяющих всем заданным условиям (None - условие не проверяется).
+        Каждое условие берётся из своего индекса, наборы строк пересекаются.
+        """
+        candidates: List[RowSet] = []
+        if unique_id is not None:
+            row = self.student_row(unique_id)
+            candidates.append(_EMPTY_ROWS if row < 0 else self.sessions_of(np.array([row])))
+        if group is not None or subgroup is not None:
+            candidates.append(self.sessions_of(self.student_rows(group, subgroup)))
+        if lab_work_number is not None:
+            candidates.append(self.sessions_of_lab(lab_work_number))
+        if date_from is not None or date_to is not None:
+            candidates.append(self.sessions_between(date_from, date_to))
+        if not candidates:
+            rows = np.arange(self._table.n_sessions, dtype=np.int64)
+        else:
+            candidates.sort(key=lambda candidate: candidate.size)
+            rows = candidates[0]
+            for candidate in candidates[1:]:
+                rows = np.intersect1d(rows, candidate, assume_unique=True)
+        if presence is not None:
+            rows = rows[self._table.sessions['presence'][rows] == (1 if presence else 0)]
+        return rows
+
+    def owners(self, rows: RowSet) -> RowSet:
+        """
+        Строки студентов, которым принадлежат занятия rows (без повторов)
+        """
+        return np.unique(self._owners[rows])
+
+    def absent_students(self, rows: Union[RowSet, None] = None) -> np.ndarray:
+        """
+        unique_id студентов, пропустивших хотя бы одно из занятий rows (по умолчанию - все занятия).
+        Пример: кто пропускал занятия в октябре 2023
+            index.absent_students(index.sessions_between(date(2023, 10, 1), date(2023, 10, 31)))
+        """
+        rows = self.query(presence=False) if rows is None else \
+            rows[self._table.sessions['presence'][rows] == 0]
+        return self._table.students['unique_id'][self.owners(rows)]
+
+    def mean_marks_by_group(self, rows: Union[RowSet, None] = None,
+                            by_subgroup: bool = False) -> Dict[Union[int, Tuple[int, int]], float]:
+        """
+        Средняя оценка по группам (или по парам (group, subgroup)) среди занятий rows с оценкой.
+        Группы без оценок в результат не попадают.
+        """
+        sessions = self._table.sessions
+        rows = np.arange(sessions.size) if rows is None else np.asarray(rows)
+        rows = rows[sessions['lab_work_mark'][rows] >= 0]
+        groups = self._by_subgroup if by_subgroup else self._by_group
+        keys = list(groups.keys())
+        codes = np.empty(len(self._table), dtype=np.int64)
+        for code, key in enumerate(keys):
+            codes[groups[key]] = code
+        owner_codes = codes[self._owners[rows]]
+        totals = np.bincount(owner_codes, weights=sessions['lab_work_mark'][rows], minlength=len(keys))
+        counts = np.bincount(owner_codes, minlength=len(keys))
+        return {key: float(totals[code] / counts[code]) for code, key in enumerate(keys) if counts[code]}
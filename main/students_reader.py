@@ -1,14 +1,60 @@
-import datetime
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Iterable, Iterator, Tuple
 from collections import namedtuple
-from datetime import date
+from functools import lru_cache
+from datetime import date, datetime
+from array import array
 import os.path
+import io
+import sys
 import json
 import csv
 
 
 LAB_WORK_SESSION_KEYS = ("presence", "lab_work_n", "lab_work_mark", "date")
 STUDENT_KEYS = ("unique_id", "name", "surname", "group", "subgroup", "lab_works_sessions")
+# размер кэшей разбора и форматирования дат занятий (различных дат обычно несколько десятков)
+DATE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_session_date(raw: str) -> date:
+    """
+    Разбор даты занятия в формате d:m:yy (равносильно datetime.strptime(raw, '%d:%m:%y').date()).
+    Частый вид dd:mm:yy разбирается напрямую, остальные строки (однозначные день и месяц, пробелы и т.п.)
+    передаются strptime. Результат кэшируется по исходной строке.
+    """
+    if len(raw) == 8 and raw[2] == raw[5] == ':' and raw.isascii() and \
+            (raw[0:2] + raw[3:5] + raw[6:8]).isdigit():
+        year = int(raw[6:8])
+        # как и у strptime: 00-68 -> 20xx, 69-99 -> 19xx
+        return date(year + (2000 if year < 69 else 1900), int(raw[3:5]), int(raw[0:2]))
+    return datetime.strptime(raw, '%d:%m:%y').date()
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def format_session_date(value: date) -> str:
+    """
+    Дата занятия в формате dd:mm:yy (равносильно value.strftime('%d:%m:%y')).
+    Результат кэшируется по дате.
+    """
+    return f"{value.day:02}:{value.month:02}:{value.year % 100:02}"
+
+
+# шаблоны строкового представления LabWorkSession и Student
+_SESSION_TEMPLATE = ('{{\n'
+                     '    "presence":      {},\n'
+                     '    "lab_work_n":    {},\n'
+                     '    "lab_work_mark": {},\n'
+                     '    "date":          "{}"\n'
+                     '}}')
+_STUDENT_TEMPLATE = ('{{\n'
+                     '    "unique_id":          {},\n'
+                     '    "name":               "{}",\n'
+                     '    "surname":            "{}",\n'
+                     '    "group":              {},\n'
+                     '    "subgroup":           {},\n'
+                     '    "lab_works_sessions": [\n')
+_STUDENT_TEMPLATE_END = '\n    ]\n}'
 
 
 class LabWorkSession(namedtuple('LabWorkSession', 'presence, lab_work_number, lab_work_mark, lab_work_date')):
@@ -49,13 +95,22 @@ class LabWorkSession(namedtuple('LabWorkSession', 'presence, lab_work_number, la
 
         return True
 
+    @classmethod
+    def from_trusted_rows(cls, rows: Union[Iterable[Tuple[bool, int, int, date]], array]) -> List['LabWorkSession']:
+        """
+        Создание занятий без проверки _validate_session (как namedtuple._make) из кортежей
+        (presence, lab_work_number, lab_work_mark, lab_work_date) или из упакованного array('i')
+        (см. PACKED_SESSION_SIZE, например, students_table.packed_sessions).
+        Только для данных, проверенных заранее целиком, например, через students_table.invalid_sessions.
+        """
+        if isinstance(rows, array):
+            return list(_unpack_sessions(rows))
+        new = tuple.__new__
+        return [new(cls, row) for row in rows]
+
     def __str__(self) -> str:
-        return f'{{\n' \
-               f'    "presence":      {1 if self.presence else 0},\n' \
-               f'    "lab_work_n":    {self.lab_work_number},\n' \
-               f'    "lab_work_mark": {self.lab_work_mark},\n' \
-               f'    "date":          "{self.lab_work_date.strftime("%d:%m:%y")}"\n' \
-               f'}}'
+        return _SESSION_TEMPLATE.format(1 if self.presence else 0, self.lab_work_number, self.lab_work_mark,
+                                        format_session_date(self.lab_work_date))
 
     # @property
     # def presence(self) -> int:
@@ -73,6 +128,72 @@ class LabWorkSession(namedtuple('LabWorkSession', 'presence, lab_work_number, la
     # def lab_work_date(self) -> date:
     #     return self._lab_work_date
 
+# занятия студента хранятся упакованными в array('i') по PACKED_SESSION_SIZE чисел на занятие:
+# порядковый номер даты (date.toordinal(), 0 - даты нет), номер л.р., оценка, присутствие (0/1)
+PACKED_SESSION_SIZE = 4
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def session_date_from_ordinal(ordinal: int) -> Union[date, None]:
+    """
+    Общий пул дат занятий: при распаковке одна и та же дата отдаётся одним и тем же объектом
+    """
+    return date.fromordinal(ordinal) if ordinal else None
+
+
+def _pack_sessions(sessions: Iterable[LabWorkSession], packed: array) -> array:
+    """
+    Дописывает занятия sessions в упакованное представление packed.
+    Номер и оценка л.р. должны быть целыми числами в диапазоне int32, иначе выбрасывается ValueError,
+    а packed остаётся без изменений.
+    """
+    size = len(packed)
+    for presence, lab_work_number, lab_work_mark, lab_work_date in sessions:
+        try:
+            packed.extend((0 if lab_work_date is None else lab_work_date.toordinal(), lab_work_number,
+                           lab_work_mark, 1 if presence else 0))
+        except (TypeError, OverflowError) as ex:
+            del packed[size:]
+            raise ValueError(f"Student :: lab work session can not be stored: lab_work_number and lab_work_mark "
+                             f"must be int32 integers, got {lab_work_number!r} and {lab_work_mark!r}") from ex
+    return packed
+
+
+def intern_string(value):
+    """
+    Общий объект для повторяющихся строк (имена и фамилии загружаемых студентов), не-строки возвращаются как есть
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+def intern_names(students: Iterable['Student']) -> None:
+    """
+    Интернирование имён и фамилий студентов, полученных из другого процесса: строки после pickle
+    создаются заново и не совпадают с интернированными строками этого процесса
+    """
+    for student in students:
+        student._name = sys.intern(student._name)
+        student._surname = sys.intern(student._surname)
+
+
+def _unpack_sessions(packed: array) -> Iterator[LabWorkSession]:
+    """
+    Распаковка занятий (они были проверены при упаковке, поэтому создаются без повторной проверки)
+    """
+    new = tuple.__new__
+    for index in range(0, len(packed), PACKED_SESSION_SIZE):
+        ordinal, lab_work_number, lab_work_mark, presence = packed[index: index + PACKED_SESSION_SIZE]
+        yield new(LabWorkSession, (presence == 1, lab_work_number, lab_work_mark, session_date_from_ordinal(ordinal)))
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _session_date_text(ordinal: int) -> str:
+    """
+    Дата упакованного занятия в формате dd:mm:yy (кэшируется по порядковому номеру даты)
+    """
+    return format_session_date(session_date_from_ordinal(ordinal))
+
+
 class Student:
     __slots__ = ('_unique_id', '_name', '_surname', '_group', '_subgroup', '_lab_work_sessions')
 
@@ -89,7 +210,7 @@ class Student:
         self._surname = surname
         self._group = group
         self._subgroup = subgroup
-        self._lab_work_sessions = []
+        self._lab_work_sessions = array('i')
 
         if not self._build_student(unique_id, name, surname, group, subgroup):
             raise ValueError(f"LabWorkSession ::"
@@ -100,6 +221,26 @@ class Student:
                              f"lab_work_date  : {group}\n"
                              f"subgroup      :  {subgroup}\n")
 
+    @classmethod
+    def from_trusted(cls, unique_id: int, name: str, surname: str, group: int, subgroup: int,
+                     lab_work_sessions: Union[List[LabWorkSession], array, None] = None) -> 'Student':
+        """
+        Создание студента без проверки _build_student. Занятия не проверяются: это список LabWorkSession
+        или уже упакованный array('i') (см. PACKED_SESSION_SIZE), который используется без копирования.
+        Только для данных, проверенных заранее целиком (например, через students_table.invalid_students).
+        """
+        student = object.__new__(cls)
+        student._unique_id = unique_id
+        student._name = name
+        student._surname = surname
+        student._group = group
+        student._subgroup = subgroup
+        if isinstance(lab_work_sessions, array):
+            student._lab_work_sessions = lab_work_sessions
+        else:
+            student._lab_work_sessions = _pack_sessions(lab_work_sessions or (), array('i'))
+        return student
+
     def _build_student(self, unique_id: int, name: str, surname: str, group: int, subgroup: int) -> bool:
         """
             param: unique_id: уникальный идентификатор студента (int)
@@ -160,18 +301,9 @@ class Student:
         }
         """
 
-        lab_sessions_str = ',\n'.join([str(session) for session in self._lab_work_sessions])
-
-        return f'{{\n' \
-               f'    "unique_id":          {self._unique_id},\n' \
-               f'    "name":               "{self._name}",\n' \
-               f'    "surname":            "{self._surname}",\n' \
-               f'    "group":              {self._group},\n' \
-               f'    "subgroup":           {self._subgroup},\n' \
-               f'    "lab_works_sessions": [\n' \
-               f'{lab_sessions_str}\n' \
-               f'    ]\n' \
-               f'}}'
+        output = io.StringIO()
+        _write_student_text(output, self)
+        return output.getvalue()
 
     @property
     def unique_id(self) -> int:
@@ -229,10 +361,10 @@ class Student:
     @property
     def lab_work_sessions(self):
         """
-        Метод доступа для списка лабораторных работ, которые студент посетил или не посетил
+        Метод доступа для списка лабораторных работ, которые студент посетил или не посетил.
+        Занятия хранятся упакованными и распаковываются в LabWorkSession при обходе.
         """
-        for session in self._lab_work_sessions:
-            yield session
+        yield from _unpack_sessions(self._lab_work_sessions)
 
     def append_lab_work_session(self, session: LabWorkSession):
         """
@@ -240,11 +372,198 @@ class Student:
         """
         if not isinstance(session, LabWorkSession):
             raise TypeError('incorrect value type in appending LabWorkSession')
-        self._lab_work_sessions.append(session)
+        _pack_sessions((session,), self._lab_work_sessions)
+
+    def extend_lab_work_sessions(self, sessions: List[LabWorkSession]):
+        """
+        Метод для регистрации нескольких лабораторных занятий без проверки типа каждого из них
+        """
+        _pack_sessions(sessions, self._lab_work_sessions)
+
+    @property
+    def n_lab_work_sessions(self) -> int:
+        """
+        Количество лабораторных занятий
+        """
+        return len(self._lab_work_sessions) // PACKED_SESSION_SIZE
 
     @lab_work_sessions.setter
     def lab_work_sessions(self, value):
-        self._lab_work_sessions = value
+        self._lab_work_sessions = _pack_sessions(value or (), array('i'))
+
+
+def _write_student_text(output, student: Student) -> None:
+    """
+    Запись строкового представления студента (как Student.__str__) в текстовый поток output.
+    Занятия форматируются прямо из упакованного представления, без создания LabWorkSession.
+    """
+    output.write(_STUDENT_TEMPLATE.format(student._unique_id, student._name, student._surname, student._group,
+                                          student._subgroup))
+    packed = student._lab_work_sessions
+    template = _SESSION_TEMPLATE
+    output.write(',\n'.join([template.format(packed[index + 3], packed[index + 1], packed[index + 2],
+                                              _session_date_text(packed[index]))
+                              for index in range(0, len(packed), PACKED_SESSION_SIZE)]))
+    output.write(_STUDENT_TEMPLATE_END)
+
+
+def write_students_text(output, students: Iterable[Student], end: str = '\n') -> None:
+    """
+    Запись строковых представлений студентов (Student.__str__) в текстовый поток output (файл, io.StringIO),
+    после каждого студента записывается end (как у print)
+    """
+    for student in students:
+        _write_student_text(output, student)
+        output.write(end)
+
+
+def dump_students_text(students: Iterable[Student], end: str = '\n') -> str:
+    """
+    Строковые представления студентов одной строкой, то же, что ''.join(str(student) + end for student in students)
+    """
+    output = io.StringIO()
+    write_students_text(output, students, end)
+    return output.getvalue()
+
+
+LoadError = namedtuple('LoadError', 'row, field, error_type, message')
+ERROR_POLICIES = ("strict", "skip", "collect")
+# сколько записей об ошибках хранит отчёт при политике "collect" (счётчики ведутся по всем ошибкам)
+MAX_COLLECTED_ERRORS = 1000
+
+
+class StudentsLoadError(ValueError):
+    """
+    Ошибка загрузки студентов при политике "strict"
+    """
+    def __init__(self, error: LoadError):
+        super().__init__(f"row {error.row}, field \"{error.field}\": {error.error_type}: {error.message}")
+        self.error = error
+
+
+class LoadReport:
+    """
+    Отчёт об ошибках загрузки студентов.
+    Номер строки (row) - номер строки csv-файла (заголовок - строка 1) или номер студента в массиве "students"
+    json-файла (с 0). Политики:
+        "strict"  - первая ошибка прерывает загрузку исключением StudentsLoadError;
+        "skip"    - ошибочные записи пропускаются, считается только количество ошибок по типам;
+        "collect" - как "skip", но дополнительно сохраняются первые max_errors записей LoadError.
+    """
+    __slots__ = ('_policy', '_max_errors', '_errors', '_counts')
+
+    def __init__(self, policy: str = "collect", max_errors: int = MAX_COLLECTED_ERRORS):
+        if policy not in ERROR_POLICIES:
+            raise ValueError(f"Unknown error policy \"{policy}\", expected one of: {', '.join(ERROR_POLICIES)}")
+        self._policy = policy
+        self._max_errors = max_errors
+        self._errors: List[LoadError] = []
+        self._counts: Dict[str, int] = {}
+
+    def add(self, row: int, field: str, exception: Exception) -> None:
+        """
+        Регистрация ошибки (вызывается только при ошибке, поэтому сообщение формируется только здесь)
+        """
+        self._add(LoadError(row, field, type(exception).__name__, str(exception)), exception)
+
+    def _add(self, error: LoadError, cause: Union[Exception, None] = None) -> None:
+        if self._policy == "strict":
+            raise StudentsLoadError(error) from cause
+        self._counts[error.error_type] = self._counts.get(error.error_type, 0) + 1
+        if self._policy == "collect" and len(self._errors) < self._max_errors:
+            self._errors.append(error)
+
+    def merge(self, other: 'LoadReport', row_offset: int = 0) -> None:
+        """
+        Добавление ошибок другого отчёта (например, отчёта части файла) со сдвигом номеров строк
+        """
+        for error in other._errors:
+            self._add(error._replace(row=error.row + row_offset))
+        if self._policy == "strict":
+            return
+        collected = {}
+        for error in other._errors:
+            collected[error.error_type] = collected.get(error.error_type, 0) + 1
+        # ошибки, которые не попали в записи другого отчёта, учитываются только в счётчиках
+        for error_type, count in other._counts.items():
+            self._counts[error_type] = self._counts.get(error_type, 0) + count - collected.get(error_type, 0)
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    @property
+    def errors(self) -> List[LoadError]:
+        """
+        Сохранённые записи об ошибках (не более max_errors)
+        """
+        return self._errors
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """
+        Количество ошибок по типам исключений
+        """
+        return self._counts
+
+    @property
+    def n_errors(self) -> int:
+        return sum(self._counts.values())
+
+    @property
+    def truncated(self) -> bool:
+        """
+        Есть ли ошибки, записи о которых не сохранены
+        """
+        return self.n_errors > len(self._errors)
+
+    def __str__(self) -> str:
+        counts = ', '.join(f"{error_type}: {count}" for error_type, count in self._counts.items())
+        return f"LoadReport ({self._policy}): {self.n_errors} errors" + (f" ({counts})" if counts else "")
+
+
+def start_report(report: Union[LoadReport, None]) -> Tuple[LoadReport, bool]:
+    """
+    Отчёт для загрузчика: переданный или собственный (вторым значением возвращается признак собственного)
+    """
+    return (LoadReport(), True) if report is None else (report, False)
+
+
+def finish_report(report: LoadReport, is_own: bool) -> None:
+    """
+    Если вызывающий код не передал отчёт, вместо сообщения на каждую ошибку выводится одна итоговая строка
+    """
+    if is_own and report.n_errors:
+        print(report)
+
+
+def _json_session_error_field(json_node) -> str:
+    """
+    Поле занятия json-файла, из-за которого не удалось создать LabWorkSession
+    """
+    if not isinstance(json_node, dict):
+        return "lab_works_sessions"
+    for key in LAB_WORK_SESSION_KEYS:
+        if key not in json_node:
+            return key
+    for key, parser in (("lab_work_n", int), ("lab_work_mark", int), ("date", parse_session_date)):
+        try:
+            parser(json_node[key])
+        except Exception:
+            return key
+    return "lab_work_session"
+
+
+def _json_student_error_field(json_node) -> str:
+    """
+    Поле студента json-файла, из-за которого не удалось создать Student
+    """
+    if not isinstance(json_node, dict):
+        return "students"
+    for key in STUDENT_KEYS:
+        if key not in json_node:
+            return key
+    return "student"
 
 
 def _load_lab_work_session(json_node) -> object:
@@ -260,35 +579,30 @@ def _load_lab_work_session(json_node) -> object:
     return LabWorkSession(presence=True if json_node['presence'] == 1 else False,
                           lab_work_number=int(json_node['lab_work_n']),
                           lab_work_mark=int(json_node['lab_work_mark']),
-                          lab_work_date=datetime.datetime.strptime(json_node['date'], '%d:%m:%y').date())
+                          lab_work_date=parse_session_date(json_node['date']))
 
 
-def _load_student(json_node) -> Student:
+def _load_student(json_node, report: Union[LoadReport, None] = None, row: int = 0) -> Student:
     """
         Создание из под-дерева json-файла экземпляра класса Student.
         Если в процессе создания LabWorkSession у студента случается ошибка,
-        создание самого студента ломаться не должно.
+        создание самого студента ломаться не должно: ошибка регистрируется в report
+        (номер студента row), а занятие пропускается.
     """
     for key in STUDENT_KEYS:
         if key not in json_node:
             raise KeyError(f"_load_student:: key \"{key}\"not present in json_node")
     student = Student(json_node['unique_id'],
-                      json_node['name'],
-                      json_node['surname'],
+                      intern_string(json_node['name']),
+                      intern_string(json_node['surname']),
                       int(json_node['group']),
                       int(json_node['subgroup']))
-    for session in json_node['lab_works_sessions']:
+    for index, session in enumerate(json_node['lab_works_sessions']):
         try:
             student.append_lab_work_session(_load_lab_work_session(session))
-        except ValueError as e:
-            print(e)
-            continue
-        except KeyError as e:
-            print(e)
-            continue
-        except Exception as e:
-            print(e)
-            continue
+        except Exception as ex:
+            if report is not None:
+                report.add(row, f"lab_works_sessions[{index}].{_json_session_error_field(session)}", ex)
     return student
 
 
@@ -305,120 +619,457 @@ STUD_PRESENCE = 6
 LAB_WORK_NUMBER = 7
 LAB_WORK_MARK = 8
 
-def load_students_csv(file_path: str) -> Union[List[Student], None]:
+class StudentsOrderError(ValueError):
     """
-    Загрузка списка студентов из csv-файла.
-    Ошибка создания экземпляра класса Student не должна приводить к поломке всего чтения.
+    Строки csv-файла не упорядочены по unique_id, хотя загрузчик ожидает упорядоченный файл
     """
-    assert isinstance(file_path, str)
-    if not os.path.exists(file_path):
-        return None
 
+
+def _read_csv_row(line: List[str]) -> Tuple[int, str, str, int, int, bool, int, int, date]:
+    """
+    Разбор строки csv-файла: поля студента и поля лабораторного занятия
+    """
+    return (int(line[UNIQUE_ID]), sys.intern(line[STUD_NAME]), sys.intern(line[STUD_SURNAME]), int(line[STUD_GROUP]),
+            int(line[STUD_SUBGROUP]), True if int(line[STUD_PRESENCE]) == 1 else False, int(line[LAB_WORK_NUMBER]),
+            int(line[LAB_WORK_MARK]), parse_session_date(line[LAB_WORK_DATE].strip('"')))
+
+
+_CSV_FIELD_PARSERS = ((UNIQUE_ID, "unique_id", int), (STUD_GROUP, "group", int), (STUD_SUBGROUP, "subgroup", int),
+                      (LAB_WORK_DATE, "date", lambda value: parse_session_date(value.strip('"'))),
+                      (STUD_PRESENCE, "presence", int), (LAB_WORK_NUMBER, "lab_work_number", int),
+                      (LAB_WORK_MARK, "lab_work_mark", int))
+
+
+def _csv_error_field(line: List[str]) -> str:
+    """
+    Поле строки csv-файла, из-за которого строку не удалось разобрать
+    """
+    if len(line) <= LAB_WORK_MARK:
+        return "row"
+    for column, field, parser in _CSV_FIELD_PARSERS:
+        try:
+            parser(line[column])
+        except Exception:
+            return field
+    try:
+        Student(*_read_csv_row(line)[:5])
+    except Exception:
+        return "student"
+    return "lab_work_session"
+
+
+def iter_students_csv(file_path: str, presorted: bool = True,
+                      report: Union[LoadReport, None] = None) -> Iterator[Student]:
+    """
+    Потоковая загрузка студентов из csv-файла.
+    Если строки файла упорядочены по unique_id (presorted=True), студент отдаётся сразу после того,
+    как закончились его строки, и в памяти хранится только текущий студент.
+    Если unique_id уменьшается (в том числе студент встречается повторно после своих строк),
+    выбрасывается StudentsOrderError.
+    При presorted=False все студенты накапливаются и отдаются после чтения файла в порядке первого появления.
+    Ошибка создания экземпляра класса Student не должна приводить к поломке всего чтения:
+    ошибочная строка регистрируется в report (см. LoadReport) и пропускается.
+    """
+    assert isinstance(file_path, str)
+    report, is_own_report = start_report(report)
     students_raw: Dict[int, Student] = {}
+    current: Union[Student, None] = None
 
     with open(file_path, 'r', encoding='utf-8') as input_file:
         csv_reader = csv.reader(input_file, delimiter=';')
-        next(csv_reader)
+        next(csv_reader, None)
 
         for line in csv_reader:
             try:
-                unique_id = int(line[0])
-                name = line[1]
-                surname = line[2]
-                group = int(line[3])
-                subgroup = int(line[4])
-                presence = True if int(line[6]) == 1 else False
-                lab_work_number = int(line[7])
-                lab_work_mark = int(line[8])
-                lab_work_date = datetime.datetime.strptime(line[5].strip('"'), '%d:%m:%y').date()
-
-                if unique_id not in students_raw:
-                    students_raw[unique_id] = Student(unique_id, name, surname, group, subgroup)
-
-
-                session = LabWorkSession(presence, lab_work_number, lab_work_mark, lab_work_date)
-                students_raw[unique_id].append_lab_work_session(session)
+                unique_id, name, surname, group, subgroup, *session_args = _read_csv_row(line)
+
+                if not presorted:
+                    if unique_id not in students_raw:
+                        students_raw[unique_id] = Student(unique_id, name, surname, group, subgroup)
+                    students_raw[unique_id].append_lab_work_session(LabWorkSession(*session_args))
+                    continue
+
+                if current is None or current.unique_id != unique_id:
+                    # в упорядоченном файле достаточно помнить только предыдущий unique_id
+                    if current is not None and unique_id < current.unique_id:
+                        raise StudentsOrderError(f"iter_students_csv:: file \"{file_path}\" is not sorted by "
+                                                 f"unique_id ({unique_id} after {current.unique_id}), "
+                                                 f"use presorted=False")
+                    student = Student(unique_id, name, surname, group, subgroup)
+                    if current is not None:
+                        yield current
+                    current = student
+                current.append_lab_work_session(LabWorkSession(*session_args))
+            except StudentsOrderError:
+                raise
             except Exception as ex:
-                print(f"Ошибка при обработке строки: {ex}")
+                report.add(csv_reader.line_num, _csv_error_field(line), ex)
                 continue
-    return list(students_raw.values())
+
+    if current is not None:
+        yield current
+    yield from students_raw.values()
+    finish_report(report, is_own_report)
 
 
-def load_students_json(file_path: str) -> Union[List[Student], None]:
+def load_students_csv(file_path: str, report: Union[LoadReport, None] = None) -> Union[List[Student], None]:
     """
-    Загрузка списка студентов из json-файла.
+    Загрузка списка студентов из csv-файла.
     Ошибка создания экземпляра класса Student не должна приводить к поломке всего чтения.
+    :param report: отчёт, в который собираются ошибки (по умолчанию выводится только итог)
+    """
+    assert isinstance(file_path, str)
+    if not os.path.exists(file_path):
+        return None
+    return list(iter_students_csv(file_path, presorted=False, report=report))
+
+
+# примерный размер части csv-файла, которую разбирает один процесс при параллельной загрузке
+CSV_SHARD_SIZE = 1 << 24
+
+
+def _csv_shard_bounds(file_path: str, shard_size: int) -> List[Tuple[int, int]]:
+    """
+    Разбиение csv-файла (без строки заголовка) на диапазоны байт [start, stop), границы которых
+    совпадают с началом строк. Поля с переводом строки внутри кавычек не поддерживаются.
+    """
+    with open(file_path, 'rb') as input_file:
+        input_file.readline()
+        start = input_file.tell()
+        file_size = input_file.seek(0, os.SEEK_END)
+        bounds = []
+        while start < file_size:
+            input_file.seek(min(start + max(1, shard_size), file_size))
+            if input_file.tell() < file_size:
+                input_file.readline()
+            stop = input_file.tell()
+            bounds.append((start, stop))
+            start = stop
+    return bounds
+
+
+def _load_csv_shard(file_path: str, start: int, stop: int, policy: str) -> Tuple[List[Student], int, LoadReport]:
+    """
+    Разбор части csv-файла (выполняется в процессе из пула).
+    :return: студенты в порядке первого появления, количество строк части и отчёт об ошибках
+             (номера строк в нём считаются от начала части, с 0)
+    """
+    with open(file_path, 'rb') as input_file:
+        input_file.seek(start)
+        text = input_file.read(stop - start).decode('utf-8')
+    students: Dict[int, Student] = {}
+    # при политике "strict" часть разбирается до первой ошибки, а исключение выбрасывает основной процесс
+    report = LoadReport("collect", 1) if policy == "strict" else LoadReport(policy)
+    # строки делятся так же, как при чтении файла в текстовом режиме (str.splitlines делит ещё и по
+    # \x0b, \x1c, U+2028 и т.п., которые внутри поля перевода строки не означают)
+    csv_reader = csv.reader(io.StringIO(text, newline=''), delimiter=';')
+    for line in csv_reader:
+        try:
+            unique_id, name, surname, group, subgroup, *session_args = _read_csv_row(line)
+            if unique_id not in students:
+                students[unique_id] = Student(unique_id, name, surname, group, subgroup)
+            students[unique_id].append_lab_work_session(LabWorkSession(*session_args))
+        except Exception as ex:
+            report.add(csv_reader.line_num - 1, _csv_error_field(line), ex)
+            if policy == "strict":
+                break
+    return list(students.values()), csv_reader.line_num, report
+
+
+def merge_students(groups: Iterable[Iterable[Student]], copy: bool = True) -> List[Student]:
+    """
+    Объединение студентов по unique_id: данные студента берутся из первого появления,
+    занятия дописываются в порядке следования групп.
+    :param copy: объединять в копии студентов, не изменяя исходные (False - только если исходные
+                 студенты больше нигде не используются, например, результаты разбора частей файла)
+    """
+    students: Dict[int, Student] = {}
+    for group in groups:
+        for student in group:
+            merged = students.get(student.unique_id)
+            if merged is None:
+                students[student.unique_id] = Student.from_trusted(
+                    student.unique_id, student.name, student.surname, student.group, student.subgroup,
+                    array('i', student._lab_work_sessions)) if copy else student
+            else:
+                merged._lab_work_sessions.extend(student._lab_work_sessions)
+    return list(students.values())
+
+
+def load_students_csv_parallel(file_path: str, n_processes: Union[int, None] = None, shard_size: int = CSV_SHARD_SIZE,
+                               report: Union[LoadReport, None] = None) -> Union[List[Student], None]:
+    """
+    Параллельная загрузка списка студентов из csv-файла.
+    Файл делится на части по shard_size байт, выровненные по границам строк, части разбираются в пуле процессов,
+    после чего студенты объединяются по unique_id. Результат совпадает с load_students_csv: студенты идут
+    в порядке первого появления, занятия - в порядке строк файла.
+    Ошибки разбора частей собираются в report с номерами строк файла (заголовок - строка 1).
+    :param n_processes: количество процессов, по умолчанию os.cpu_count()
+    :param report: отчёт, в который собираются ошибки (по умолчанию выводится только итог)
     """
     assert isinstance(file_path, str)
     if not os.path.exists(file_path):
         return None
+    report, is_own_report = start_report(report)
+    bounds = _csv_shard_bounds(file_path, shard_size)
+    n_processes = max(1, min(n_processes or os.cpu_count() or 1, len(bounds)))
+    if n_processes == 1:
+        shards = [_load_csv_shard(file_path, start, stop, report.policy) for start, stop in bounds]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=n_processes) as executor:
+            futures = [executor.submit(_load_csv_shard, file_path, start, stop, report.policy)
+                       for start, stop in bounds]
+            shards = [future.result() for future in futures]
 
-    with open(file_path, "r", encoding="utf-8") as file:
-        students = []
-        data = json.load(file)
-        for student in data['students']:
-            students.append(_load_student(student))
+    first_line = 2
+    for _, n_lines, shard_report in shards:
+        report.merge(shard_report, first_line)
+        first_line += n_lines
+    students = merge_students((shard_students for shard_students, _, _ in shards), copy=False)
+    if n_processes > 1:
+        intern_names(students)
+    finish_report(report, is_own_report)
     return students
 
 
-def save_students_json(file_path: str, students: List[Student]):
+# размер блока, которым читается json-файл при потоковой загрузке
+JSON_READ_SIZE = 1 << 16
+JSON_BACKENDS = ("auto", "stdlib", "ijson")
+_JSON_WHITESPACE = ' \t\n\r'
+
+
+class _JsonStreamReader:
     """
-    Запись списка студентов в json файл
+    Буфер над текстовым файлом для пошагового разбора json через json.JSONDecoder.raw_decode.
+    В буфере хранится только ещё не разобранный хвост прочитанных данных.
     """
-    student_data = []
-    for student in students:
-        lab_works_sessions = []
-        if student._lab_work_sessions is not None:
-            for session in student._lab_work_sessions:
-                session_dict = {
-                    "date": session.lab_work_date.strftime("%d:%m:%y"),
-                    "presence":  1 if session.presence else 0,
-                    "lab_work_n": session.lab_work_number,
-                    "lab_work_mark": session.lab_work_mark
-                }
-                lab_works_sessions.append(session_dict)
-
-        student_dict = {
-            "unique_id": student.unique_id,
-            "name": student._name,
-            "surname": student._surname,
-            "group": student._group,
-            "subgroup": student._subgroup,
-            "lab_works_sessions": lab_works_sessions
-        }
+    __slots__ = ('_file', '_read_size', '_buffer', '_position', '_eof', '_decoder')
 
+    def __init__(self, file, read_size: int = JSON_READ_SIZE):
+        self._file = file
+        self._read_size = max(1, read_size)
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
 
-        student_data.append(student_dict)
-    data_for_save = {
-        "students": student_data
-    }
-    with open(file_path, 'w', encoding="utf-8") as json_file:
-        json.dump(data_for_save, json_file, ensure_ascii=False, indent=4)
+    def _read_more(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(self._read_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # разобранное начало буфера отбрасывается
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Первый непробельный символ (не извлекается из буфера), '' - конец файла
+        """
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _JSON_WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_more():
+                return ''
+
+    def expect(self, symbols: str) -> str:
+        """
+        Извлечение одного из символов-разделителей symbols
+        """
+        symbol = self.peek()
+        if symbol == '' or symbol not in symbols:
+            raise json.JSONDecodeError(f"Expecting one of '{symbols}'", self._buffer, self._position)
+        self._position += 1
+        return symbol
 
+    def value(self):
+        """
+        Разбор одного json-значения. Если значение упирается в конец буфера (например, число
+        или незакрытый объект), буфер дочитывается и разбор повторяется.
+        """
+        self.peek()
+        while True:
+            try:
+                result, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if self._read_more():
+                    continue
+                raise
+            if end == len(self._buffer) and self._read_more():
+                continue
+            self._position = end
+            return result
 
-def save_students_csv(file_path: str, students: List[Student]):
+
+def _iter_json_array_stdlib(file, key: str, read_size: int) -> Iterator[dict]:
     """
-       Запись списка студентов в csv файл
-       """
-    ...
-    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+    Элементы массива, лежащего по ключу key в корневом объекте json-файла.
+    Остальные значения корневого объекта разбираются и отбрасываются.
+    """
+    reader = _JsonStreamReader(file, read_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        raise KeyError(key)
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name != key:
+            reader.value()
+        else:
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.expect(']')
+                return
+            while True:
+                yield reader.value()
+                if reader.expect(',]') == ']':
+                    return
+        if reader.expect(',}') == '}':
+            raise KeyError(key)
+
+
+def _iter_json_array_ijson(file, key: str) -> Iterator[dict]:
+    import ijson
+    found = False
+    for item in ijson.items(file, f'{key}.item', use_float=True):
+        found = True
+        yield item
+    if not found:
+        # ijson не отличает пустой массив от его отсутствия, поэтому файл перечитывается
+        file.seek(0)
+        if not any(prefix == key for prefix, event, _ in ijson.parse(file) if event == 'start_array'):
+            raise KeyError(key)
+
+
+def iter_students_json(file_path: str, backend: str = "auto", read_size: int = JSON_READ_SIZE,
+                       report: Union[LoadReport, None] = None) -> Iterator[Student]:
+    """
+    Потоковая загрузка студентов из json-файла.
+    Файл читается блоками по read_size символов, элементы массива "students" разбираются по одному
+    и сразу отдаются в виде Student, так что дерево всего документа в памяти не строится.
+    :param backend: "stdlib" - json.JSONDecoder.raw_decode, "ijson" - библиотека ijson,
+                    "auto" - ijson, если она установлена, иначе stdlib
+    :param report: отчёт, в который собираются ошибки студентов и занятий (по умолчанию выводится только итог)
+    """
+    assert isinstance(file_path, str)
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown json backend \"{backend}\", expected one of: {', '.join(JSON_BACKENDS)}")
+    if backend == "auto":
+        try:
+            import ijson
+            backend = "ijson"
+        except ImportError:
+            backend = "stdlib"
+
+    report, is_own_report = start_report(report)
+    with open(file_path, "rb" if backend == "ijson" else "r", encoding=None if backend == "ijson" else "utf-8") as file:
+        nodes = _iter_json_array_ijson(file, 'students') if backend == "ijson" else \
+            _iter_json_array_stdlib(file, 'students', read_size)
+        for row, node in enumerate(nodes):
+            try:
+                student = _load_student(node, report, row)
+            except StudentsLoadError:
+                raise
+            except Exception as ex:
+                report.add(row, _json_student_error_field(node), ex)
+                continue
+            yield student
+    finish_report(report, is_own_report)
+
+
+def load_students_json(file_path: str, report: Union[LoadReport, None] = None) -> Union[List[Student], None]:
+    """
+    Загрузка списка студентов из json-файла.
+    Ошибка создания экземпляра класса Student не должна приводить к поломке всего чтения.
+    :param report: отчёт, в который собираются ошибки (по умолчанию выводится только итог)
+    """
+    assert isinstance(file_path, str)
+    if not os.path.exists(file_path):
+        return None
 
-        fieldnames = ["unique_id", "name", "surname", "group", "subgroup", "date", "presence", "lab_work_number", "lab_work_mark"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, delimiter=';')
+    return list(iter_students_json(file_path, report=report))
 
-        writer.writeheader()
 
+CSV_HEADER = ("unique_id", "name", "surname", "group", "subgroup", "date", "presence", "lab_work_number",
+              "lab_work_mark")
+# количество строк csv, которые передаются в один вызов writerows
+CSV_WRITE_BATCH = 4096
+
+# шаблоны записи json: с отступами (как у json.dump(..., indent=4)) и компактный
+_JSON_PRETTY_SESSION = ('{{\n'
+                        '                    "date": "{}",\n'
+                        '                    "presence": {},\n'
+                        '                    "lab_work_n": {},\n'
+                        '                    "lab_work_mark": {}\n'
+                        '                }}')
+_JSON_PRETTY_STUDENT = ('{{\n'
+                        '            "unique_id": {},\n'
+                        '            "name": {},\n'
+                        '            "surname": {},\n'
+                        '            "group": {},\n'
+                        '            "subgroup": {},\n'
+                        '            "lab_works_sessions": {}\n'
+                        '        }}')
+_JSON_PRETTY_LAYOUT = ('{\n    "students": [\n        ', ',\n        ', '\n    ]\n}', '{\n    "students": []\n}',
+                       '[\n                ', ',\n                ', '\n            ]')
+_JSON_COMPACT_SESSION = '{{"date":"{}","presence":{},"lab_work_n":{},"lab_work_mark":{}}}'
+_JSON_COMPACT_STUDENT = ('{{"unique_id":{},"name":{},"surname":{},"group":{},"subgroup":{},'
+                         '"lab_works_sessions":{}}}')
+_JSON_COMPACT_LAYOUT = ('{"students":[', ',', ']}', '{"students":[]}', '[', ',', ']')
+
+
+def _dump_json_student(student: Student, pretty: bool) -> str:
+    session_template, student_template = (_JSON_PRETTY_SESSION, _JSON_PRETTY_STUDENT) if pretty else \
+        (_JSON_COMPACT_SESSION, _JSON_COMPACT_STUDENT)
+    *_, open_list, separator, close_list = _JSON_PRETTY_LAYOUT if pretty else _JSON_COMPACT_LAYOUT
+    sessions = [session_template.format(format_session_date(session.lab_work_date), 1 if session.presence else 0,
+                                        session.lab_work_number, session.lab_work_mark)
+                for session in student.lab_work_sessions]
+    sessions = open_list + separator.join(sessions) + close_list if sessions else '[]'
+    return student_template.format(student._unique_id, json.dumps(student._name, ensure_ascii=False),
+                                   json.dumps(student._surname, ensure_ascii=False), student._group,
+                                   student._subgroup, sessions)
+
+
+def save_students_json(file_path: str, students: Iterable[Student], pretty: bool = True):
+    """
+    Запись студентов в json файл.
+    Студенты записываются по одному по мере обхода students (подходит любой итерируемый объект, в том числе
+    генератор iter_students_json), поэтому целиком в памяти не хранятся.
+    :param pretty: True - с отступами в 4 пробела (как json.dump(..., indent=4)), False - компактная запись
+    """
+    head, separator, tail, empty, *_ = _JSON_PRETTY_LAYOUT if pretty else _JSON_COMPACT_LAYOUT
+    with open(file_path, 'w', encoding="utf-8") as json_file:
+        is_first = True
+        for student in students:
+            json_file.write(head if is_first else separator)
+            json_file.write(_dump_json_student(student, pretty))
+            is_first = False
+        json_file.write(empty if is_first else tail)
+
+
+def save_students_csv(file_path: str, students: Iterable[Student]):
+    """
+    Запись студентов в csv файл.
+    Строки собираются в кортежи и записываются пачками по CSV_WRITE_BATCH, студенты обходятся по одному
+    (подходит любой итерируемый объект, в том числе генератор iter_students_csv).
+    """
+    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile, delimiter=';')
+        writer.writerow(CSV_HEADER)
+        rows = []
         for student in students:
-            if student._lab_work_sessions is not None:
-                for session in student._lab_work_sessions:
-                    writer.writerow({
-                        "unique_id": student._unique_id,
-                        "name": student._name,
-                        "surname": student._surname,
-                        "group": student._group,
-                        "subgroup": student._subgroup,
-                        "date": session.lab_work_date.strftime("%d:%m:%y"),
-                        "presence": 1 if session.presence else 0,
-                        "lab_work_number": session.lab_work_number,
-                        "lab_work_mark": session.lab_work_mark
-                    })
\ No newline at end of file
+            for session in student.lab_work_sessions:
+                rows.append((student._unique_id, student._name, student._surname, student._group, student._subgroup,
+                             format_session_date(session.lab_work_date), 1 if session.presence else 0,
+                             session.lab_work_number, session.lab_work_mark))
+            if len(rows) >= CSV_WRITE_BATCH:
+                writer.writerows(rows)
+                rows.clear()
+        writer.writerows(rows)
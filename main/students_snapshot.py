@@ -0,0 +1,226 @@
+from typing import Iterable, Iterator, Tuple, Union
+import struct
+import zlib
+import numpy as np
+from students_reader import Student
+from students_table import StudentTable, STUDENT_DTYPE, SESSION_DTYPE, invalid_sessions, invalid_students, \
+    packed_sessions
+
+"""
+Двоичный снимок (snapshot) студентов для быстрой повторной загрузки без разбора csv/json.
+Формат файла (все числа little-endian, каждая секция выровнена на 8 байт):
+    заголовок   : магическая строка, версия, crc32 всех секций после заголовка,
+                  количества студентов, занятий и строк, размер пула строк
+    students    : STUDENT_DTYPE, по строке на студента
+    name        : int32, номер имени студента в пуле строк
+    surname     : int32, номер фамилии студента в пуле строк
+    offsets     : int64, границы занятий студентов (n_students + 1 значение)
+    sessions    : SESSION_DTYPE, упорядочены по студентам
+    str_offsets : int64, границы строк в пуле (n_strings + 1 значение)
+    pool        : байты строк в utf-8, каждая различная строка хранится один раз
+При загрузке файл отображается в память через np.memmap, колонки - это представления (view) отображения,
+поэтому открытие снимка не зависит от его размера, а объекты Student создаются только при обращении.
+"""
+
+SNAPSHOT_MAGIC = b'STUDSNAP'
+SNAPSHOT_VERSION = 1
+# magic, version, reserved, checksum, n_students, n_sessions, n_strings, pool_size
+_HEADER = struct.Struct('<8sHHIQQQQ')
+_ALIGNMENT = 8
+
+
+class SnapshotError(ValueError):
+    """
+    Файл не является снимком студентов поддерживаемой версии или повреждён
+    """
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _sections(n_students: int, n_sessions: int, n_strings: int, pool_size: int) -> Tuple[Tuple[str, np.dtype, int],
+                                                                                          ...]:
+    """
+    Секции файла в порядке записи: (имя, тип элемента, количество элементов)
+    """
+    return (('students', STUDENT_DTYPE, n_students),
+            ('name', np.dtype('<i4'), n_students),
+            ('surname', np.dtype('<i4'), n_students),
+            ('offsets', np.dtype('<i8'), n_students + 1),
+            ('sessions', SESSION_DTYPE, n_sessions),
+            ('str_offsets', np.dtype('<i8'), n_strings + 1),
+            ('pool', np.dtype('u1'), pool_size))
+
+
+def _string_pool(names: np.ndarray, surnames: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, bytes]:
+    """
+    Пул различных строк: номера имён, номера фамилий, границы строк и байты пула
+    """
+    strings, inverse = np.unique(np.concatenate((names, surnames)).astype(object), return_inverse=True)
+    encoded = [value.encode('utf-8') for value in strings]
+    str_offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+    np.cumsum([len(value) for value in encoded], out=str_offsets[1:])
+    inverse = inverse.astype('<i4')
+    return inverse[:names.size], inverse[names.size:], str_offsets, b''.join(encoded)
+
+
+def save_students_snapshot(file_path: str, students: Union[StudentTable, Iterable[Student]]):
+    """
+    Запись студентов в двоичный снимок.
+    Студенты с номером или оценкой л.р., не помещающимися в колонки SESSION_DTYPE, не записываются:
+    StudentTable.from_students выбрасывает ValueError до создания файла.
+    :param students: таблица StudentTable или любой итерируемый объект со студентами
+    """
+    table = students if isinstance(students, StudentTable) else StudentTable.from_students(students)
+    name, surname, str_offsets, pool = _string_pool(table.names, table.surnames)
+    columns = {'students': table.students, 'name': name, 'surname': surname,
+               'offsets': table.offsets.astype('<i8'), 'sessions': table.sessions,
+               'str_offsets': str_offsets, 'pool': np.frombuffer(pool, dtype='u1')}
+    sections = _sections(len(table), table.n_sessions, str_offsets.size - 1, len(pool))
+
+    checksum = 0
+    payload = []
+    for section, dtype, count in sections:
+        data = np.ascontiguousarray(columns[section], dtype=dtype).tobytes()
+        data += b'\0' * (_aligned(len(data)) - len(data))
+        checksum = zlib.crc32(data, checksum)
+        payload.append(data)
+
+    with open(file_path, 'wb') as output_file:
+        output_file.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, checksum, len(table),
+                                       table.n_sessions, str_offsets.size - 1, len(pool)))
+        for data in payload:
+            output_file.write(data)
+
+
+class StudentsSnapshot:
+    """
+    Открытый снимок студентов. Ведёт себя как последовательность Student (len, индексация, итерация),
+    студенты создаются при обращении. Колонки доступны без копирования через свойства и table.
+    """
+    __slots__ = ('_file_path', '_raw', '_columns', '_checksum', '_strings')
+
+    def __init__(self, file_path: str):
+        raw = np.memmap(file_path, dtype='u1', mode='r')
+        if raw.size < _HEADER.size:
+            raise SnapshotError(f"load_students_snapshot:: file \"{file_path}\" is too short")
+        magic, version, _, checksum, n_students, n_sessions, n_strings, pool_size = \
+            _HEADER.unpack(raw[:_HEADER.size].tobytes())
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"load_students_snapshot:: file \"{file_path}\" is not a students snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"load_students_snapshot:: unsupported snapshot version {version}, "
+                                f"expected {SNAPSHOT_VERSION}")
+        columns = {}
+        position = _HEADER.size
+        for section, dtype, count in _sections(n_students, n_sessions, n_strings, pool_size):
+            size = dtype.itemsize * count
+            if position + size > raw.size:
+                raise SnapshotError(f"load_students_snapshot:: file \"{file_path}\" is truncated")
+            columns[section] = raw[position: position + size].view(dtype)
+            position += _aligned(size)
+        self._file_path = file_path
+        self._raw = raw
+        self._columns = columns
+        self._checksum = checksum
+        self._strings = {}
+
+    def verify(self) -> None:
+        """
+        Проверка контрольной суммы всех секций и векторная проверка всех студентов и занятий (читает весь файл).
+        Объекты Student создаются из снимка без построчной проверки, поэтому снимки из ненадёжных
+        источников нужно открывать с verify=True.
+        """
+        if zlib.crc32(self._raw[_HEADER.size:]) != self._checksum:
+            raise SnapshotError(f"load_students_snapshot:: checksum mismatch in \"{self._file_path}\"")
+        columns = self._columns
+        lengths = np.diff(columns['str_offsets'])
+        if (lengths < 0).any() or (columns['str_offsets'][-1] != columns['pool'].size) or \
+                (columns['offsets'][0] != 0) or (np.diff(columns['offsets']) < 0).any() or \
+                (columns['offsets'][-1] != columns['sessions'].size):
+            raise SnapshotError(f"load_students_snapshot:: inconsistent offsets in \"{self._file_path}\"")
+        if invalid_students(columns['students'], lengths[columns['name']], lengths[columns['surname']]).any() or \
+                invalid_sessions(columns['sessions']).any():
+            raise SnapshotError(f"load_students_snapshot:: invalid students or sessions in \"{self._file_path}\"")
+
+    def string(self, index: int) -> str:
+        """
+        Строка пула с номером index (декодированные строки запоминаются)
+        """
+        value = self._strings.get(index)
+        if value is None:
+            start, stop = self._columns['str_offsets'][index: index + 2]
+            value = self._columns['pool'][start: stop].tobytes().decode('utf-8')
+            self._strings[index] = value
+        return value
+
+    def __len__(self) -> int:
+        return self._columns['students'].size
+
+    def __getitem__(self, index: int) -> Student:
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"StudentsSnapshot :: index {index} is out of range")
+        index %= len(self)
+        unique_id, group, subgroup = self._columns['students'][index].tolist()
+        return Student.from_trusted(unique_id, self.string(int(self._columns['name'][index])),
+                                    self.string(int(self._columns['surname'][index])), group, subgroup,
+                                    packed_sessions(self._columns['sessions'], self._columns['offsets'],
+                                                   index, index + 1)[0])
+
+    def __iter__(self) -> Iterator[Student]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def checksum(self) -> int:
+        """
+        Контрольная сумма снимка из заголовка
+        """
+        return self._checksum
+
+    @property
+    def students(self) -> np.ndarray:
+        """
+        Колонки студентов (STUDENT_DTYPE, отображение файла)
+        """
+        return self._columns['students']
+
+    @property
+    def sessions(self) -> np.ndarray:
+        """
+        Колонки занятий (SESSION_DTYPE, отображение файла)
+        """
+        return self._columns['sessions']
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """
+        Границы занятий студентов: занятия студента i - sessions[offsets[i]:offsets[i + 1]]
+        """
+        return self._columns['offsets']
+
+    @property
+    def table(self) -> StudentTable:
+        """
+        StudentTable поверх отображённых колонок (копируются только имена и фамилии)
+        """
+        names = [self.string(index) for index in self._columns['name'].tolist()]
+        surnames = [self.string(index) for index in self._columns['surname'].tolist()]
+        return StudentTable(self._columns['students'], names, surnames, self._columns['sessions'])
+
+
+def load_students_snapshot(file_path: str, verify: bool = False) -> Union[StudentsSnapshot, None]:
+    """
+    Открытие двоичного снимка студентов.
+    :param verify: проверить контрольную сумму (требует чтения всего файла)
+    :return: StudentsSnapshot или None, если файла нет
+    """
+    assert isinstance(file_path, str)
+    try:
+        snapshot = StudentsSnapshot(file_path)
+    except FileNotFoundError:
+        return None
+    if verify:
+        snapshot.verify()
+    return snapshot
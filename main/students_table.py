@@ -0,0 +1,281 @@
+from typing import Iterable, List, Union
+from datetime import date
+from array import array
+import numpy as np
+from students_reader import Student, PACKED_SESSION_SIZE
+
+"""
+Колоночное хранилище студентов и лабораторных занятий.
+Вместо отдельного объекта на каждое занятие данные лежат в двух структурированных массивах:
+    students: unique_id (int64), group (int32), subgroup (int32) + массивы имён и фамилий
+    sessions: student (int32, номер строки в students), date (int32, дни от 1970-01-01, NO_DATE - даты нет),
+              lab_work_number (int16), presence (uint8), lab_work_mark (int8, -1 - нет оценки)
+Номер и оценка л.р., не помещающиеся в int16 и int8, при построении таблицы отвергаются (ValueError).
+Занятия упорядочены по студентам: занятия студента i - это sessions[offsets[i]:offsets[i + 1]].
+"""
+
+STUDENT_DTYPE = np.dtype([('unique_id', '<i8'), ('group', '<i4'), ('subgroup', '<i4')])
+SESSION_DTYPE = np.dtype([('student', '<i4'), ('date', '<i4'), ('lab_work_number', '<i2'),
+                          ('presence', 'u1'), ('lab_work_mark', 'i1')])
+
+# date.toordinal() для 1970-01-01, чтобы колонка date совпадала с np.datetime64(..., 'D')
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# значение колонки date для занятий без даты (lab_work_date=None, допустимо только при отсутствии студента)
+NO_DATE = np.iinfo(np.int32).min
+
+
+def date_to_days(value: date) -> int:
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def invalid_sessions(sessions: np.ndarray) -> np.ndarray:
+    """
+    Маска занятий, не проходящих LabWorkSession._validate_session
+    """
+    number = sessions['lab_work_number']
+    return ((sessions['presence'] == 0) & (number >= -1)) | ((sessions['lab_work_mark'] == -1) & (number == 1)) | \
+        ((sessions['presence'] != 0) & (sessions['date'] == NO_DATE))
+
+
+def invalid_students(students: np.ndarray, name_lengths: np.ndarray, surname_lengths: np.ndarray) -> np.ndarray:
+    """
+    Маска студентов, не проходящих Student._build_student (типы полей гарантирует STUDENT_DTYPE)
+    """
+    return (name_lengths == 0) | (surname_lengths == 0) | ((students['subgroup'] <= 0) & (students['group'] <= 0))
+
+
+def packed_sessions(sessions: np.ndarray, offsets: np.ndarray, start: int, stop: int) -> List[array]:
+    """
+    Упакованные занятия студентов [start, stop) (см. students_reader.PACKED_SESSION_SIZE):
+    колонки таблицы переставляются в порядок упаковки одной векторной операцией.
+    """
+    rows = sessions[offsets[start]: offsets[stop]]
+    packed = np.empty((rows.size, PACKED_SESSION_SIZE), dtype=np.intc)
+    packed[:, 0] = np.where(rows['date'] == NO_DATE, 0, rows['date'] + EPOCH_ORDINAL)
+    packed[:, 1] = rows['lab_work_number']
+    packed[:, 2] = rows['lab_work_mark']
+    packed[:, 3] = rows['presence']
+    bounds = (offsets[start: stop + 1] - offsets[start]).tolist()
+    return [array('i', packed[bounds[i]: bounds[i + 1]].tobytes()) for i in range(stop - start)]
+
+
+class StudentTable:
+    __slots__ = ('_students', '_names', '_surnames', '_sessions', '_offsets', '_is_validated')
+
+    def __init__(self, students: np.ndarray, names: np.ndarray, surnames: np.ndarray, sessions: np.ndarray):
+        """
+            param: students: структурированный массив STUDENT_DTYPE
+            param: names: массив имён (по строке на студента)
+            param: surnames: массив фамилий (по строке на студента)
+            param: sessions: структурированный массив SESSION_DTYPE, упорядоченный по полю student
+        """
+        if students.dtype != STUDENT_DTYPE or sessions.dtype != SESSION_DTYPE:
+            raise TypeError('incorrect value type in building StudentTable')
+        if not (students.size == len(names) == len(surnames)):
+            raise ValueError(f"StudentTable ::"
+                             f"incorrect args :\n"
+                             f"students: {students.size},\n"
+                             f"names   : {len(names)},\n"
+                             f"surnames: {len(surnames)}")
+        student_index = sessions['student']
+        if student_index.size and (np.any(np.diff(student_index) < 0) or student_index[0] < 0 or
+                                   student_index[-1] >= students.size):
+            raise ValueError('StudentTable :: sessions must be sorted by student and refer to existing students')
+        self._students = students
+        self._names = np.asarray(names, dtype=object)
+        self._surnames = np.asarray(surnames, dtype=object)
+        self._sessions = sessions
+        self._offsets = np.searchsorted(student_index, np.arange(students.size + 1))
+        self._is_validated = False
+
+    @staticmethod
+    def from_students(students: Iterable[Student]) -> 'StudentTable':
+        """
+        Построение таблицы из объектов Student
+        """
+        unique_ids, groups, subgroups = array('q'), array('i'), array('i')
+        names: List[str] = []
+        surnames: List[str] = []
+        # упакованные занятия всех студентов подряд и количество занятий каждого студента
+        packed, counts = array('i'), array('q')
+        for student in students:
+            unique_ids.append(student.unique_id)
+            groups.append(student.group)
+            subgroups.append(student.subgroup)
+            names.append(student.name)
+            surnames.append(student.surname)
+            packed.extend(student._lab_work_sessions)
+            counts.append(student.n_lab_work_sessions)
+
+        students_array = np.empty(len(unique_ids), dtype=STUDENT_DTYPE)
+        students_array['unique_id'] = np.frombuffer(unique_ids, dtype=np.int64) if unique_ids else 0
+        students_array['group'] = np.frombuffer(groups, dtype=np.int32) if groups else 0
+        students_array['subgroup'] = np.frombuffer(subgroups, dtype=np.int32) if subgroups else 0
+
+        packed = np.frombuffer(packed, dtype=np.intc).reshape((-1, PACKED_SESSION_SIZE)) if packed else \
+            np.empty((0, PACKED_SESSION_SIZE), dtype=np.intc)
+        # присваивание в узкие колонки SESSION_DTYPE молча обрезало бы значения
+        for column, field in ((1, 'lab_work_number'), (2, 'lab_work_mark')):
+            limits = np.iinfo(SESSION_DTYPE[field])
+            wrong = (packed[:, column] < limits.min) | (packed[:, column] > limits.max)
+            if wrong.any():
+                raise ValueError(f"StudentTable :: {field} must be in range [{limits.min}, {limits.max}], "
+                                 f"got {packed[wrong, column][:10].tolist()}")
+        sessions_array = np.empty(packed.shape[0], dtype=SESSION_DTYPE)
+        sessions_array['student'] = np.repeat(np.arange(len(counts), dtype=np.int32),
+                                              np.frombuffer(counts, dtype=np.int64) if counts else 0)
+        sessions_array['date'] = np.where(packed[:, 0] == 0, NO_DATE, packed[:, 0] - EPOCH_ORDINAL)
+        sessions_array['lab_work_number'] = packed[:, 1]
+        sessions_array['lab_work_mark'] = packed[:, 2]
+        sessions_array['presence'] = packed[:, 3]
+        return StudentTable(students_array, names, surnames, sessions_array)
+
+    def validate(self) -> None:
+        """
+        Проверка всех студентов и занятий таблицы разом (векторно), после которой объекты Student
+        и LabWorkSession создаются без проверки каждого из них
+        """
+        bad_students = invalid_students(self._students, np.fromiter(map(len, self._names), dtype=np.int64,
+                                                                    count=len(self._names)),
+                                        np.fromiter(map(len, self._surnames), dtype=np.int64,
+                                                    count=len(self._surnames)))
+        bad_sessions = invalid_sessions(self._sessions)
+        if bad_students.any() or bad_sessions.any():
+            raise ValueError(f"StudentTable ::"
+                             f"invalid rows :\n"
+                             f"students: {np.flatnonzero(bad_students)[:10].tolist()} ({bad_students.sum()} total),\n"
+                             f"sessions: {np.flatnonzero(bad_sessions)[:10].tolist()} ({bad_sessions.sum()} total)")
+        self._is_validated = True
+
+    def _validate_once(self) -> None:
+        """
+        Проверка таблицы перед первым созданием объектов без построчной проверки (см. validate)
+        """
+        if not self._is_validated:
+            self.validate()
+
+    def to_students(self) -> List[Student]:
+        """
+        Обратное преобразование в список объектов Student.
+        Таблица проверяется один раз целиком (validate), объекты создаются без построчной проверки.
+        """
+        self._validate_once()
+        sessions = packed_sessions(self._sessions, self._offsets, 0, self._students.size)
+        return [Student.from_trusted(unique_id, name, surname, group, subgroup, student_sessions)
+                for (unique_id, group, subgroup), name, surname, student_sessions in
+                zip(self._students.tolist(), self._names.tolist(), self._surnames.tolist(), sessions)]
+
+    def student(self, index: int) -> Student:
+        """
+        Объект Student для строки index таблицы студентов.
+        При первом обращении таблица проверяется целиком (validate), дальше объекты создаются без проверки.
+        """
+        self._validate_once()
+        unique_id, group, subgroup = self._students[index].tolist()
+        return Student.from_trusted(unique_id, self._names[index], self._surnames[index], group, subgroup,
+                                    packed_sessions(self._sessions, self._offsets, index, index + 1)[0])
+
+    def __len__(self) -> int:
+        return self._students.size
+
+    @property
+    def students(self) -> np.ndarray:
+        """
+        Метод доступа для таблицы студентов
+        """
+        return self._students
+
+    @property
+    def names(self) -> np.ndarray:
+        """
+        Метод доступа для имён студентов
+        """
+        return self._names
+
+    @property
+    def surnames(self) -> np.ndarray:
+        """
+        Метод доступа для фамилий студентов
+        """
+        return self._surnames
+
+    @property
+    def sessions(self) -> np.ndarray:
+        """
+        Метод доступа для таблицы лабораторных занятий
+        """
+        return self._sessions
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """
+        Границы занятий студентов: занятия студента i - sessions[offsets[i]:offsets[i + 1]]
+        """
+        return self._offsets
+
+    @property
+    def n_sessions(self) -> int:
+        """
+        Количество лабораторных занятий
+        """
+        return self._sessions.size
+
+    @property
+    def session_dates(self) -> np.ndarray:
+        """
+        Даты занятий в виде np.datetime64[D] (NaT для занятий без даты)
+        """
+        dates = self._sessions['date'].astype('datetime64[D]')
+        dates[self._sessions['date'] == NO_DATE] = np.datetime64('NaT')
+        return dates
+
+    def student_index(self, unique_id: int) -> int:
+        """
+        Номер строки студента с заданным unique_id или -1
+        """
+        found = np.flatnonzero(self._students['unique_id'] == unique_id)
+        return int(found[0]) if found.size else -1
+
+    def sessions_of(self, unique_id: int) -> np.ndarray:
+        """
+        Занятия студента с заданным unique_id (пустой массив, если студента нет)
+        """
+        index = self.student_index(unique_id)
+        if index < 0:
+            return self._sessions[:0]
+        return self._sessions[self._offsets[index]: self._offsets[index + 1]]
+
+    def sessions_mask(self, group: Union[int, None] = None, subgroup: Union[int, None] = None,
+                      lab_work_number: Union[int, None] = None, presence: Union[bool, None] = None,
+                      date_from: Union[date, None] = None, date_to: Union[date, None] = None) -> np.ndarray:
+        """
+        Маска занятий, удовлетворяющих всем заданным условиям (None - условие не проверяется).
+        Даты date_from и date_to входят в диапазон, занятия без даты в диапазон не попадают.
+        """
+        mask = np.ones(self._sessions.size, dtype=bool)
+        owners = self._sessions['student']
+        if group is not None:
+            mask &= (self._students['group'] == group)[owners]
+        if subgroup is not None:
+            mask &= (self._students['subgroup'] == subgroup)[owners]
+        if lab_work_number is not None:
+            mask &= self._sessions['lab_work_number'] == lab_work_number
+        if presence is not None:
+            mask &= self._sessions['presence'] == (1 if presence else 0)
+        if date_from is not None:
+            mask &= self._sessions['date'] >= date_to_days(date_from)
+        if date_to is not None:
+            mask &= (self._sessions['date'] <= date_to_days(date_to)) & (self._sessions['date'] != NO_DATE)
+        return mask
+
+    def mean_marks(self, mask: Union[np.ndarray, None] = None) -> np.ndarray:
+        """
+        Средняя оценка каждого студента по занятиям с оценкой (NaN, если оценок нет).
+        :param mask: необязательная маска занятий (см. sessions_mask)
+        """
+        sessions = self._sessions if mask is None else self._sessions[mask]
+        sessions = sessions[sessions['lab_work_mark'] >= 0]
+        totals = np.bincount(sessions['student'], weights=sessions['lab_work_mark'], minlength=self._students.size)
+        counts = np.bincount(sessions['student'], minlength=self._students.size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return totals / counts
@@ -0,0 +1,5 @@
+import os.path
+import sys
+
+# модули проекта импортируются от каталога main (как при запуске main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
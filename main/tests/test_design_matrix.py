@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from regressions.design_matrix import polynomial_design_matrix, polynomial_normal_equations, polynomial_powers
+from regressions.regression import Regression
+
+
+def test_polynomial_powers_order():
+    assert polynomial_powers(2, 2).tolist() == [[2, 0], [1, 1], [0, 2], [1, 0], [0, 1], [0, 0]]
+    assert polynomial_powers(3, 1).tolist() == [[1, 0, 0], [0, 1, 0], [0, 0, 1], [0, 0, 0]]
+    assert polynomial_powers(1, 3).tolist() == [[3], [2], [1], [0]]
+    with pytest.raises(ValueError):
+        polynomial_powers(0, 2)
+
+
+def test_design_matrix_columns():
+    args = np.random.default_rng(0).uniform(-2.0, 2.0, (15, 3))
+    powers = polynomial_powers(3, 3)
+    expected = np.prod(args[:, np.newaxis, :] ** powers, axis=-1)
+    assert np.allclose(polynomial_design_matrix(args, 3), expected)
+    x, y = args[:, 0], args[:, 1]
+    assert np.allclose(polynomial_design_matrix(args[:, :2], 2),
+                       np.column_stack((x * x, x * y, y * y, x, y, np.ones_like(x))))
+
+
+def test_design_matrix_one_arg_and_out():
+    x = np.arange(6)
+    out = np.empty((6, 4))
+    assert polynomial_design_matrix(x, 3, out=out) is out
+    assert np.allclose(out, np.vander(x, 4))
+    with pytest.raises(ValueError):
+        polynomial_design_matrix(x, 3, out=np.empty((6, 3)))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 18])
+def test_normal_equations_match_design_matrix(chunk_size):
+    rng = np.random.default_rng(1)
+    args = rng.uniform(-1.0, 1.0, (50, 2))
+    targets = rng.normal(size=50)
+    design = polynomial_design_matrix(args, 3)
+    gram, rhs = polynomial_normal_equations(args, targets, 3, chunk_size)
+    assert np.allclose(gram, design.T @ design)
+    assert np.allclose(rhs, design.T @ targets)
+
+
+@pytest.mark.parametrize("method", ["cholesky", "qr", "lstsq"])
+def test_quadratic_regression_2d_term_order(method):
+    rng = np.random.default_rng(2)
+    x, y = rng.uniform(-1.0, 1.0, (2, 40))
+    z = 1.5 * x * x - 0.5 * x * y + 2.0 * y * y + 3.0 * x - y + 0.25
+    assert np.allclose(Regression.quadratic_regression_2d(x, y, z, method), [1.5, -0.5, 2.0, 3.0, -1.0, 0.25])
+    design = np.column_stack((x * x, x * y, y * y, x, y, np.ones_like(x)))
+    assert np.allclose(Regression.poly_surface_regression(np.column_stack((x, y)), z, 2, method),
+                       np.linalg.lstsq(design, z, rcond=None)[0])
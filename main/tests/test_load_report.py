@@ -0,0 +1,55 @@
+import pytest
+from students_reader import LoadReport, LoadError, StudentsLoadError
+
+
+def _report(policy: str, max_errors: int, errors):
+    report = LoadReport(policy, max_errors)
+    for row, exception in errors:
+        report.add(row, "field", exception)
+    return report
+
+
+_ERRORS = [(0, ValueError("a")), (1, KeyError("b")), (2, ValueError("c")), (3, ValueError("d")), (4, KeyError("e"))]
+
+
+def test_collect_keeps_first_errors_and_counts_all():
+    report = _report("collect", 2, _ERRORS)
+    assert report.errors == [LoadError(0, "field", "ValueError", "a"), LoadError(1, "field", "KeyError", "'b'")]
+    assert report.counts == {"ValueError": 3, "KeyError": 2}
+    assert report.n_errors == 5 and report.truncated
+    assert str(report) == "LoadReport (collect): 5 errors (ValueError: 3, KeyError: 2)"
+
+
+def test_skip_counts_only():
+    report = _report("skip", 10, _ERRORS)
+    assert report.errors == [] and report.n_errors == 5 and report.truncated
+
+
+def test_strict_raises_on_first_error():
+    report = LoadReport("strict")
+    with pytest.raises(StudentsLoadError) as raised:
+        report.add(7, "lab_work_mark", ValueError("bad mark"))
+    assert raised.value.error == LoadError(7, "lab_work_mark", "ValueError", "bad mark")
+
+
+@pytest.mark.parametrize("target_max_errors", [1, 3, 100])
+def test_merge_truncated_report(target_max_errors):
+    target = _report("collect", target_max_errors, _ERRORS[:1])
+    target.merge(_report("collect", 2, _ERRORS[1:]), row_offset=10)
+    expected = [LoadError(0, "field", "ValueError", "a"), LoadError(11, "field", "KeyError", "'b'"),
+                LoadError(12, "field", "ValueError", "c")]
+    assert target.errors == expected[:target_max_errors]
+    assert target.counts == {"ValueError": 3, "KeyError": 2}
+    assert target.n_errors == 5 and target.truncated
+
+
+def test_merge_skip_report_and_into_strict():
+    target = LoadReport("collect")
+    target.merge(_report("skip", 10, _ERRORS), row_offset=1)
+    assert target.errors == [] and target.counts == {"ValueError": 3, "KeyError": 2}
+
+    strict = LoadReport("strict")
+    strict.merge(LoadReport("collect"), row_offset=5)
+    with pytest.raises(StudentsLoadError) as raised:
+        strict.merge(_report("collect", 1, _ERRORS[2:]), row_offset=5)
+    assert raised.value.error.row == 7
@@ -0,0 +1,68 @@
+import warnings
+import numpy as np
+import pytest
+from regressions.regression import Regression
+
+
+def _lstsq_poly(x: np.ndarray, y: np.ndarray, order: int) -> np.ndarray:
+    return np.linalg.lstsq(np.vander(x, order, increasing=True), y, rcond=None)[0]
+
+
+def _batch_with_degenerate_series(rng: np.random.Generator):
+    x = rng.uniform(-1.0, 1.0, (6, 20))
+    y = rng.uniform(-1.0, 1.0, (6, 20))
+    x[2] = 0.1
+    x[4, ::2], x[4, 1::2] = 0.3, -0.7
+    return x, y
+
+
+def test_batch_poly_regression_degenerate_series():
+    x, y = _batch_with_degenerate_series(np.random.default_rng(1))
+    for offsets in (None, np.arange(0, x.size + 1, x.shape[1])):
+        data_x, data_y = (x, y) if offsets is None else (x.ravel(), y.ravel())
+        coefficients = Regression.batch_poly_regression(data_x, data_y, 3, offsets)
+        for series in range(x.shape[0]):
+            assert np.allclose(coefficients[series], _lstsq_poly(x[series], y[series], 3))
+
+
+def test_batch_linear_regression_degenerate_series():
+    x, y = _batch_with_degenerate_series(np.random.default_rng(2))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        k, b = Regression.batch_linear_regression(x, y)
+    for series in range(x.shape[0]):
+        assert np.allclose((k[series], b[series]), _lstsq_poly(x[series], y[series], 2)[::-1])
+
+
+def test_polynom_integer_inputs():
+    x = np.arange(-5, 6)
+    b = np.array([3, -2, 0, 1])
+    result = Regression.polynom(x, b)
+    assert result.dtype == float
+    assert np.array_equal(result, np.polyval(b[::-1], x))
+    assert Regression.polynom(x, np.array([], dtype=int)).tolist() == [0.0] * x.size
+
+
+def test_polynom_coefficient_sets():
+    rng = np.random.default_rng(3)
+    x = rng.uniform(-1.0, 1.0, (4, 5))
+    b = rng.normal(size=(3, 6))
+    result = Regression.polynom(x, b)
+    assert result.shape == (3, 4, 5)
+    for index in range(b.shape[0]):
+        assert np.allclose(result[index], np.polyval(b[index, ::-1], x))
+    with pytest.raises(ValueError):
+        Regression.polynom(x, b[np.newaxis])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 100])
+def test_polynom_chunk_size_and_out(chunk_size):
+    rng = np.random.default_rng(4)
+    x = rng.uniform(-1.0, 1.0, 10)
+    b = rng.normal(size=(2, 4))
+    out = np.empty((2, 10))
+    assert Regression.polynom(x, b, out=out, chunk_size=chunk_size) is out
+    assert np.allclose(out, [np.polyval(coefficients[::-1], x) for coefficients in b])
+    assert np.allclose(Regression.polynom(x, b[0], chunk_size=chunk_size), np.polyval(b[0, ::-1], x))
+    with pytest.raises(ValueError):
+        Regression.polynom(x, b, out=np.empty(10), chunk_size=chunk_size)
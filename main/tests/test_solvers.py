@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from regressions.solvers import SOLVER_METHODS, least_squares, solve_normal_equations
+
+
+def _lstsq(design: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    return np.linalg.lstsq(design, targets, rcond=None)[0]
+
+
+@pytest.mark.parametrize("method", SOLVER_METHODS)
+def test_least_squares_matches_lstsq(method):
+    rng = np.random.default_rng(0)
+    design = rng.normal(size=(40, 4))
+    vector = rng.normal(size=40)
+    columns = rng.normal(size=(40, 3))
+    assert least_squares(design, vector, method).shape == (4,)
+    assert np.allclose(least_squares(design, vector, method), _lstsq(design, vector))
+    assert least_squares(design, columns, method).shape == (4, 3)
+    assert np.allclose(least_squares(design, columns, method), _lstsq(design, columns))
+
+
+@pytest.mark.parametrize("method", SOLVER_METHODS)
+def test_least_squares_batch_matches_lstsq(method):
+    rng = np.random.default_rng(1)
+    design = rng.normal(size=(5, 30, 3))
+    targets = rng.normal(size=(5, 30))
+    result = least_squares(design, targets, method)
+    assert result.shape == (5, 3)
+    for index in range(design.shape[0]):
+        assert np.allclose(result[index], _lstsq(design[index], targets[index]))
+
+
+@pytest.mark.parametrize("method", SOLVER_METHODS)
+def test_least_squares_integer_inputs(method):
+    design = np.vander(np.arange(10), 3, increasing=True)
+    targets = 2 + 3 * np.arange(10) - np.arange(10) ** 2
+    assert np.allclose(least_squares(design, targets, method), [2.0, 3.0, -1.0])
+
+
+def test_solve_normal_equations_singular_items():
+    rng = np.random.default_rng(2)
+    design = rng.normal(size=(6, 20, 3))
+    design[1, :, 2] = design[1, :, 0]
+    design[4] = 0.0
+    targets = rng.normal(size=(6, 20))
+    design_t = np.swapaxes(design, -1, -2)
+    gram = design_t @ design
+    rhs = np.einsum('bnf,bn->bf', design, targets)
+    result = solve_normal_equations(gram, rhs)
+    assert result.shape == (6, 3)
+    for index in range(design.shape[0]):
+        assert np.allclose(result[index], _lstsq(gram[index], rhs[index]))
+    # у невырожденных систем решение нормальных уравнений совпадает с решением по матрице признаков
+    for index in (0, 2, 3, 5):
+        assert np.allclose(result[index], _lstsq(design[index], targets[index]))
+
+
+def test_solve_normal_equations_shared_gram():
+    rng = np.random.default_rng(3)
+    design = rng.normal(size=(25, 3))
+    targets = rng.normal(size=(25, 4))
+    result = solve_normal_equations(design.T @ design, design.T @ targets)
+    assert result.shape == (3, 4)
+    assert np.allclose(result, _lstsq(design, targets))
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        least_squares(np.eye(3), np.ones(3), "inverse")
+    with pytest.raises(ValueError):
+        solve_normal_equations(np.eye(3), np.ones(3), "inverse")
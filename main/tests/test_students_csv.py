@@ -0,0 +1,42 @@
+import pytest
+from students_reader import LoadReport, load_students_csv, load_students_csv_parallel
+
+_HEADER = "unique_id;name;surname;group;subgroup;date;presence;lab_work_number;lab_work_mark"
+
+
+def _write_csv(path, lines, newline='\n'):
+    with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+        csv_file.write(newline.join([_HEADER] + lines) + newline)
+
+
+def _rows(n_students: int = 40):
+    lines = []
+    for unique_id in range(1, n_students + 1):
+        name = "Пе\x1cтр" if unique_id == 7 else "Анна Мария" if unique_id == 8 else "Анна"
+        for number in range(1, 4):
+            mark = "x" if (unique_id, number) == (9, 2) else "4"
+            lines.append(f"{unique_id};{name};Ким;{unique_id % 3 + 1};1;0{number}:10:23;1;{number};{mark}")
+    # студент, чьи строки разнесены по файлу
+    lines.append("3;Анна;Ким;1;1;04:10:23;1;4;5")
+    lines.append("bad;line")
+    return lines
+
+
+def _load(loader, path, **kwargs):
+    report = LoadReport("collect")
+    students = loader(path, report=report, **kwargs)
+    return [str(student) for student in students], report.errors
+
+
+@pytest.mark.parametrize("newline", ['\n', '\r\n'])
+@pytest.mark.parametrize("n_processes, shard_size", [(1, 1), (1, 300), (2, 300), (3, 1 << 20)])
+def test_parallel_matches_sequential(tmp_path, newline, n_processes, shard_size):
+    path = str(tmp_path / "students.csv")
+    _write_csv(path, _rows(), newline)
+    expected_students, expected_errors = _load(load_students_csv, path)
+    assert len(expected_students) == 40
+    assert [error.row for error in expected_errors] == [27, 123]
+    students, errors = _load(load_students_csv_parallel, path, n_processes=n_processes, shard_size=shard_size)
+    assert students == expected_students
+    assert errors == expected_errors
+
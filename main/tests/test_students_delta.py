@@ -0,0 +1,64 @@
+from datetime import date
+import pytest
+from students_reader import Student, LabWorkSession, LoadReport
+from students_snapshot import save_students_snapshot, load_students_snapshot
+from students_delta import StudentsDeltaLog, StaleDeltaLogError, load_students_with_deltas, compact_students
+
+
+def _sessions(student: Student):
+    return list(student.lab_work_sessions)
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = StudentsDeltaLog(str(tmp_path / "students.log"), str(tmp_path / "students.snap"))
+    log.append_student(Student(1, "Иван", "Петров", 1, 1))
+    log.append_sessions(1, [LabWorkSession(True, 1, 5, date(2023, 9, 1)), LabWorkSession(False, -2, -1, None)])
+    return log
+
+
+def test_truncated_last_line_is_reported_and_recovered(log):
+    with open(log.log_path, 'a', encoding='utf-8') as log_file:
+        log_file.write('{"op": "session", "uni')
+    report = LoadReport("collect")
+    students = load_students_with_deltas(log, report)
+    assert [error.row for error in report.errors] == [5]
+    assert len(_sessions(students[0])) == 2
+
+    log.append_sessions(1, [LabWorkSession(True, 2, 4, date(2023, 9, 8))])
+    report = LoadReport("collect")
+    students = load_students_with_deltas(log, report)
+    assert report.n_errors == 1
+    assert _sessions(students[0])[-1] == LabWorkSession(True, 2, 4, date(2023, 9, 8))
+
+
+def test_compaction_moves_records_into_snapshot(log):
+    log.edit_student(1, surname="Сидоров")
+    expected = load_students_with_deltas(log)
+    compacted = compact_students(log)
+    assert not log.has_pending_records()
+    snapshot = list(load_students_snapshot(log.snapshot_path))
+    rows = [[(student.surname, _sessions(student)) for student in students]
+            for students in (expected, compacted, snapshot)]
+    assert rows[0] == rows[1] == rows[2] == [("Сидоров", _sessions(expected[0]))]
+
+    log.append_sessions(1, [LabWorkSession(True, 2, 4, date(2023, 9, 8))])
+    report = LoadReport("collect")
+    assert len(_sessions(load_students_with_deltas(log, report)[0])) == 3
+    assert report.n_errors == 0
+
+
+def test_stale_log_is_reported_and_not_truncated(log):
+    save_students_snapshot(log.snapshot_path, [Student(2, "Анна", "Ким", 1, 2)])
+    report = LoadReport("collect")
+    students = load_students_with_deltas(log, report)
+    assert [student.unique_id for student in students] == [2]
+    assert [error.field for error in report.errors] == ["base"]
+
+    with pytest.raises(StaleDeltaLogError):
+        log.append_sessions(2, [LabWorkSession(True, 1, 5, date(2023, 9, 1))])
+    assert log.has_pending_records()
+
+    log.reset()
+    log.append_sessions(2, [LabWorkSession(True, 1, 5, date(2023, 9, 1))])
+    assert len(_sessions(load_students_with_deltas(log)[0])) == 1
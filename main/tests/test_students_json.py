@@ -0,0 +1,66 @@
+from datetime import date
+import json
+import pytest
+from students_reader import Student, LabWorkSession, LoadReport, iter_students_json, save_students_json
+
+
+def _students():
+    students = []
+    for unique_id in range(1, 6):
+        student = Student(unique_id * 1000003, "Иван" * unique_id, "Петров", unique_id, 2)
+        student.extend_lab_work_sessions([LabWorkSession(True, number, 5, date(2023, 9, number))
+                                          for number in range(1, unique_id + 1)])
+        students.append(student)
+    return students
+
+
+def _load(path, read_size, report=None):
+    return [str(student) for student in iter_students_json(path, "stdlib", read_size, report)]
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+@pytest.mark.parametrize("read_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_values_split_across_reads(tmp_path, pretty, read_size):
+    path = str(tmp_path / "students.json")
+    save_students_json(path, _students(), pretty)
+    assert _load(path, read_size) == [str(student) for student in _students()]
+
+
+@pytest.mark.parametrize("read_size", [1, 5, 1 << 16])
+def test_other_keys_are_skipped(tmp_path, read_size):
+    path = str(tmp_path / "students.json")
+    save_students_json(path, _students()[:2])
+    with open(path, encoding='utf-8') as json_file:
+        document = json.load(json_file)
+    with open(path, 'w', encoding='utf-8') as json_file:
+        json.dump({"meta": {"students": [1, 2], "text": "]}\"["}, "students": document["students"], "n": 12.5},
+                  json_file, ensure_ascii=False)
+    assert _load(path, read_size) == [str(student) for student in _students()[:2]]
+
+
+@pytest.mark.parametrize("document, expected", [('{"students": []}', []), (' { "students" : [ ] } ', []),
+                                                ('{"other": [1]}', KeyError), ('{}', KeyError),
+                                                ('{"students": [', json.JSONDecodeError)])
+def test_empty_missing_and_broken_students(tmp_path, document, expected):
+    path = str(tmp_path / "students.json")
+    with open(path, 'w', encoding='utf-8') as json_file:
+        json_file.write(document)
+    for read_size in (1, 4, 1 << 16):
+        if isinstance(expected, list):
+            assert _load(path, read_size) == expected
+        else:
+            with pytest.raises(expected):
+                _load(path, read_size)
+
+
+def test_bad_student_is_reported_with_its_row(tmp_path):
+    path = str(tmp_path / "students.json")
+    save_students_json(path, _students()[:3])
+    with open(path, encoding='utf-8') as json_file:
+        document = json.load(json_file)
+    del document["students"][1]["name"]
+    with open(path, 'w', encoding='utf-8') as json_file:
+        json.dump(document, json_file)
+    report = LoadReport("collect")
+    assert len(_load(path, 3, report)) == 2
+    assert [error.row for error in report.errors] == [1]
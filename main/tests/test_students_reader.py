@@ -0,0 +1,47 @@
+from datetime import date, datetime
+import pytest
+from students_reader import Student, LabWorkSession, parse_session_date, format_session_date
+
+
+def _student() -> Student:
+    student = Student(1, "Иван", "Петров", 1, 1)
+    student.append_lab_work_session(LabWorkSession(True, 1, 5, date(2023, 9, 1)))
+    return student
+
+
+@pytest.mark.parametrize("lab_work_number, lab_work_mark", [(2, 4.5), (2, 1 << 40), (-(1 << 40), 3)])
+def test_append_session_out_of_packed_range(lab_work_number, lab_work_mark):
+    student = _student()
+    with pytest.raises(ValueError):
+        student.append_lab_work_session(LabWorkSession(True, lab_work_number, lab_work_mark, date(2023, 9, 8)))
+    assert list(student.lab_work_sessions) == [LabWorkSession(True, 1, 5, date(2023, 9, 1))]
+
+
+def test_extend_sessions_is_atomic():
+    student = _student()
+    with pytest.raises(ValueError):
+        student.extend_lab_work_sessions([LabWorkSession(True, 2, 4, date(2023, 9, 8)),
+                                          LabWorkSession(True, 3, 2.5, date(2023, 9, 15))])
+    assert student.n_lab_work_sessions == 1
+
+
+def test_sessions_from_trusted_rows():
+    rows = [(True, 1, 5, date(2023, 9, 1)), (False, -2, -1, None)]
+    sessions = LabWorkSession.from_trusted_rows(rows)
+    assert sessions == [LabWorkSession(*row) for row in rows]
+    assert all(type(session) is LabWorkSession for session in sessions)
+    student = Student.from_trusted(1, "Иван", "Петров", 1, 1, sessions)
+    assert LabWorkSession.from_trusted_rows(student._lab_work_sessions) == sessions
+
+
+@pytest.mark.parametrize("raw", ["01:09:23", "1:9:23", " 1:2:23", "29:02:00", "01:01:69", "31:12:68",
+                                 "1:9:3", "31:02:23", "00:01:23", "1:1:1999", "01-01-23", "12:12:99 ", ""])
+def test_parse_session_date_matches_strptime(raw):
+    try:
+        expected = datetime.strptime(raw, '%d:%m:%y').date()
+    except ValueError:
+        with pytest.raises(ValueError):
+            parse_session_date(raw)
+    else:
+        assert parse_session_date(raw) == expected
+        assert format_session_date(expected) == expected.strftime('%d:%m:%y')
@@ -0,0 +1,67 @@
+from datetime import date
+import os.path
+import pytest
+from students_reader import Student, LabWorkSession
+from students_snapshot import SnapshotError, save_students_snapshot, load_students_snapshot
+
+
+def _students():
+    first = Student(1, "Иван", "Петров", 1, 1)
+    first.extend_lab_work_sessions([LabWorkSession(True, 32767, 127, date(2023, 9, 1)),
+                                    LabWorkSession(True, 0, -128, date(1969, 12, 31)),
+                                    LabWorkSession(False, -32768, -1, None)])
+    second = Student(2, "Анна", "Петров", 0, 2)
+    third = Student(3, "Иван", "Ким", 5, 0)
+    third.append_lab_work_session(LabWorkSession(True, 1, 5, date(2000, 2, 29)))
+    return [first, second, third]
+
+
+def _as_tuples(students):
+    return [(student.unique_id, student.name, student.surname, student.group, student.subgroup,
+             list(student.lab_work_sessions)) for student in students]
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "students.snap")
+    save_students_snapshot(path, _students())
+    snapshot = load_students_snapshot(path, verify=True)
+    assert len(snapshot) == 3
+    assert _as_tuples(snapshot) == _as_tuples(_students())
+    assert _as_tuples([snapshot[-1]]) == _as_tuples(_students()[-1:])
+    assert _as_tuples(snapshot.table.to_students()) == _as_tuples(_students())
+
+
+@pytest.mark.parametrize("lab_work_number, lab_work_mark", [(32768, 5), (2, 128), (2, -129)])
+def test_snapshot_refuses_values_out_of_columns(tmp_path, lab_work_number, lab_work_mark):
+    student = Student(1, "Иван", "Петров", 1, 1)
+    student.append_lab_work_session(LabWorkSession(True, lab_work_number, lab_work_mark, date(2023, 9, 1)))
+    path = str(tmp_path / "students.snap")
+    with pytest.raises(ValueError):
+        save_students_snapshot(path, [student])
+    assert not os.path.exists(path)
+
+
+def test_snapshot_missing_truncated_and_corrupt(tmp_path):
+    assert load_students_snapshot(str(tmp_path / "missing.snap")) is None
+    path = str(tmp_path / "students.snap")
+    save_students_snapshot(path, _students())
+    with open(path, 'rb') as snapshot_file:
+        data = snapshot_file.read()
+
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(data[:-16])
+    with pytest.raises(SnapshotError):
+        load_students_snapshot(path)
+
+    corrupt = bytearray(data)
+    corrupt[-8] ^= 0xFF
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(bytes(corrupt))
+    assert load_students_snapshot(path) is not None
+    with pytest.raises(SnapshotError):
+        load_students_snapshot(path, verify=True)
+
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(b'NOTASNAP' + data[8:])
+    with pytest.raises(SnapshotError):
+        load_students_snapshot(path)